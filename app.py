@@ -1,23 +1,50 @@
-from flask import Flask, request, jsonify
+import logging
+import time
+
+# Set up logging before the project modules, which log while they load
+logging.basicConfig(level=logging.INFO)
+_startup_clock = time.perf_counter()
+
+from flask import Flask, Response, request, jsonify
 import pandas as pd
-from joblib import load
 from flask_cors import CORS
-from feature_extract import extract_features
-import logging
-import os
-import shutil
+from feature_extract import (
+    extract_features, iter_network_features, start_network_sources, timed_lexical_features,
+    FEATURE_NAMES, NETWORK_SOURCES, REQUEST_DEADLINE, SOURCE_WORKERS,
+)
+from cache import TTLCache
+from sample_store import SampleStore
+from labeling import LabelingQueue, LABELS
+import scoring
+from scoring import (
+    ensemble_probability, fast_score, get_models, get_scaler, lexical_probability, predict_probabilities, scale_features,
+)
+import metrics
+import circuit_breaker
+from urllib.parse import urlparse, urlunparse
+import json
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
-import shap
 
-# Clean up __pycache__
-shutil.rmtree('__pycache__', ignore_errors=True)
+# Seconds spent in each startup phase, logged and reported by /health
+startup_timings = {}
+
+def _startup_phase(name, started):
+    """Record the phase that began at `started` and return the start of the next one."""
+    startup_timings[name] = round(time.perf_counter() - started, 3)
+    logging.info(f"Startup phase '{name}' took {startup_timings[name]:.3f}s.")
+    return time.perf_counter()
+
+_phase_clock = _startup_phase('imports', _startup_clock)
 
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "chrome-extension://ecpganmhndnnnnogcpnlafcdnekoickd"}})
 
 # Path for saving data
 DATA_PATH = 'new_data.csv'
+# Predictions waiting for a ground-truth label, kept across restarts
+LABELING_PATH = 'pending_labels.sqlite3'
 columns = [
     'url', 'status', 'actual', 'google_index', 'nb_hyperlinks', 'web_traffic', 'nb_www',
     'ratio_extHyperlinks', 'domain_age', 'phish_hints', 'safe_anchor',
@@ -36,28 +63,63 @@ columns = [
     'file_length', 'repeated_letters', 'repeated_vowels', 'vowel_repetition_ratio'
 ]
 
-# Ensure the CSV file exists with correct columns
-if not os.path.exists(DATA_PATH):
-    pd.DataFrame(columns=columns).to_csv(DATA_PATH, index=False)
-    print("New file created")
-
-# Set up logging
-logging.basicConfig(level=logging.INFO)
-
-# Load models
-logging.info("Loading models...")
-models = {
-    # 'randomforestclassifier': load("randomforestclassifier.pkl"),
-    'xgbclassifier': load("xgbclassifier.pkl"),
-    'gradientboostingclassifier': load("gradientboostingclassifier.pkl"),
-    # 'extratreesclassifier': load("extratreesclassifier.pkl"),
-}
-logging.info("Models loaded successfully.")
-
-# Load scaler
-logging.info("Loading scaler...")
-scaler = load('minmax_scaler.pkl')
-logging.info("Scaler loaded successfully.")
+# Cache of complete prediction results keyed on the normalized URL
+PREDICTION_CACHE_TTL = 10 * 60  # Seconds before a URL is scored again
+PREDICTION_CACHE_SIZE = 5000  # Maximum number of cached results, each a few KB
+prediction_cache = TTLCache(maxsize=PREDICTION_CACHE_SIZE, ttl=PREDICTION_CACHE_TTL, name='prediction')
+
+# Batch scoring limits; every extraction runs its network sources on the shared
+# source pool, so the batch pool is sized to keep those sources from queueing
+MAX_BATCH_SIZE = 1000
+BATCH_WORKERS = max(1, SOURCE_WORKERS // len(NETWORK_SOURCES))
+_batch_executor = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix='batch-extract')
+
+# Labeled samples, indexed by URL once at startup and appended by a single writer
+sample_store = SampleStore(DATA_PATH, columns)
+labeling_queue = LabelingQueue(LABELING_PATH)
+_phase_clock = _startup_phase('stores', _phase_clock)
+
+# Fast scores in this band are escalated to the full network-backed pipeline
+FAST_UNCERTAIN_BAND = (0.2, 0.8)
+
+# Models whose SHAP contributions are averaged into the explanation, and how
+# they are computed: 'exact' runs TreeSHAP, 'approximate' uses the cheaper
+# Saabas-style path attribution
+SHAP_MODELS = ['xgbclassifier', 'gradientboostingclassifier']
+SHAP_METHOD = 'exact'
+
+_explainers = None
+_explainer_lock = threading.Lock()
+
+def get_explainers():
+    """SHAP explainers, built with the first explanation request since importing shap is slow."""
+    global _explainers
+    with _explainer_lock:
+        if _explainers is None:
+            started = time.perf_counter()
+            import shap
+            models = get_models()
+            _explainers = {name: shap.TreeExplainer(models[name]) for name in SHAP_MODELS if name in models}
+            logging.info(f"SHAP explainers built for {', '.join(_explainers)} in {time.perf_counter() - started:.2f}s.")
+        return _explainers
+
+# Scaling folded into (scale, offset) and the trees flattened into arrays,
+# memory-mapped from the model bundle (see scoring.py)
+scoring.load_models()
+_phase_clock = _startup_phase('models', _phase_clock)
+
+def reload_models():
+    """
+    Pick up changed model files: reload the bundle (rebuilding it when a
+    source changed) and drop the explainers and cached predictions that
+    came from the old files.
+    """
+    global _explainers
+    with _explainer_lock:
+        _explainers = None
+        scoring.reload_models()
+    prediction_cache.clear()
+    logging.info("Models reloaded.")
 
 # def get_shap_explanations(model, features):
 #     """
@@ -78,19 +140,29 @@ logging.info("Scaler loaded successfully.")
 #     ).head(15)
 #     return shap_contributions.to_dict(orient='records')
 
-def get_shap_explanations(model, features):
+def _unsafe_class_values(shap_values):
+    """SHAP values of the first row for the "unsafe" class (class 1)."""
+    if isinstance(shap_values, list):
+        shap_values = shap_values[1]  # One array per class
+    shap_values = np.array(shap_values)
+    if shap_values.ndim == 3:
+        shap_values = shap_values[..., 1]  # Last dimension holds the classes
+    return shap_values[0]
+
+def get_shap_explanations(features, method=SHAP_METHOD):
     """
-    Calculate SHAP values for the given model and features.
+    Calculate SHAP values for the given features with the shared explainers,
+    averaging the contributions of every configured model.
     Returns the top 10 contributors for both safe and unsafe classes.
     """
-    explainer = shap.TreeExplainer(model)
-    shap_values = explainer.shap_values(features)
-
-    # Debug log for SHAP values shape
-    logging.info(f"SHAP values shape: {np.array(shap_values).shape}")
-
-    # Extract SHAP values for the "unsafe" class (class 1)
-    shap_values_class = shap_values[0][:, 1]  # Access last dimension for class 1
+    explainers = get_explainers()
+    if not explainers:
+        raise ValueError('No SHAP explainer is configured')
+    approximate = method == 'approximate'
+    shap_values_class = np.mean([
+        _unsafe_class_values(explainer.shap_values(features, approximate=approximate))
+        for explainer in explainers.values()
+    ], axis=0)
 
     # Debug log for full SHAP values
     logging.info(f"Full SHAP values for class 1: {shap_values_class}")
@@ -121,101 +193,371 @@ def get_shap_explanations(model, features):
 
 
 
-@app.route('/predict', methods=['POST'])
-def predict():
-    data = request.get_json()
-    originalUrl = data.get("url")
-    if not originalUrl:
-        return jsonify({'error': 'URL is required'}), 400
-
-    logging.info(f"Received URL: {originalUrl}")
+class FeatureColumnsError(ValueError):
+    """Raised when feature extraction does not produce the model's columns."""
 
+def normalize_url(url):
+    """
+    Canonical form of a URL used as the prediction cache key: lowercase scheme
+    and host, no default port and no fragment.
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    netloc = parsed.netloc.lower()
+    if (scheme, netloc.rpartition(':')[2]) in [('http', '80'), ('https', '443')]:
+        netloc = netloc.rpartition(':')[0]
+    return urlunparse((scheme, netloc, parsed.path, parsed.params, parsed.query, ''))
+
+def score_url(originalUrl, trace=None):
+    """
+    Run feature extraction, scaling, every model and SHAP for one URL.
+    Returns the probabilities, explanations and the extracted features.
+    Timings are added to the `trace` dict when one is given.
+    """
     # Extract features
     logging.info("Extracting features...")
-    try:
-        df_features = extract_features(originalUrl)
-        logging.info("Feature extraction successful.")
-    except Exception as e:
-        logging.error(f"Feature extraction failed for URL '{originalUrl}': {str(e)}")
-        return jsonify({'error': 'Feature extraction failed', 'details': str(e)}), 500
+    df_features = extract_features(originalUrl, trace=trace)
+    logging.info("Feature extraction successful.")
+    return score_features(df_features, trace)
 
+def score_features(df_features, trace=None):
+    """Scaling, every model and SHAP for a one-row DataFrame of extracted features."""
+    started = time.perf_counter()
     # Select and scale features
     feature_columns = columns[3:]  # Skip 'url', 'status', and 'actual'
     if not set(feature_columns).issubset(df_features.columns):
-        logging.error("Feature extraction produced incorrect columns.")
-        return jsonify({'error': 'Feature extraction produced incorrect columns'}), 400
+        raise FeatureColumnsError('Feature extraction produced incorrect columns')
 
     logging.info("Scaling features...")
-    df_features_scaled = pd.DataFrame(scaler.transform(df_features[feature_columns]), columns=feature_columns)
+    features_scaled = scale_features(df_features[feature_columns].to_numpy(dtype=float))
 
-    # Get probabilities from models
+    # Get probabilities from models and their mean
     logging.info("Calculating probabilities from models...")
-    model_probabilities = {}
-    for model_name, model in models.items():
-        try:
-            probability = model.predict_proba(df_features_scaled)[0][1]  # Probability of phishing
-            model_probabilities[model_name] = float(probability)  # Convert to float
+    final_probability, model_probabilities = ensemble_probability(features_scaled)
+    for model_name, probability in model_probabilities.items():
+        if probability is not None:
             logging.info(f"{model_name} probability: {probability:.4f}")
-        except Exception as e:
-            model_probabilities[model_name] = None
-            logging.error(f"Error with model {model_name}: {str(e)}")
-
-    # Calculate mean probability
-    valid_probabilities = [prob for prob in model_probabilities.values() if prob is not None]
-    final_probability = float(np.mean(valid_probabilities)) if valid_probabilities else None
     logging.info(f"Mean probability of phishing: {final_probability:.4f}" if final_probability is not None else "Failed to compute mean probability.")
     # logging.info(f"Features: {df_features.iloc[0].to_dict()}")
+    scored = time.perf_counter()
 
     # Generate SHAP explanations
     try:
-        shap_explanations = get_shap_explanations(models['randomforestclassifier'], df_features_scaled)
+        shap_explanations = get_shap_explanations(pd.DataFrame(features_scaled, columns=feature_columns))
     except Exception as e:
         logging.error(f"SHAP explanation generation failed: {str(e)}")
         shap_explanations = []
-    
-    # Send final probability back to the extension
-    response = jsonify({
+    if trace is not None:
+        trace['scoring_ms'] = round((scored - started) * 1000, 3)
+        trace['shap_ms'] = round((time.perf_counter() - scored) * 1000, 2)
+
+    return {
         'final_probability': final_probability,
-        'shap_explanations': shap_explanations
-    })
+        'model_probabilities': model_probabilities,
+        'shap_explanations': shap_explanations,
+        'features': df_features,
+    }
+
+@app.route('/predict', methods=['POST'])
+def predict():
+    data = request.get_json()
+    originalUrl = data.get("url")
+    if not originalUrl:
+        return jsonify({'error': 'URL is required'}), 400
+
+    logging.info(f"Received URL: {originalUrl}")
+
+    # Fast mode scores the URL string alone and only escalates uncertain scores
+    fast_probability = None
+    if data.get("mode") == 'fast':
+        if scoring.lexical_model is None:
+            logging.warning("Fast mode requested without a lexical model, using the full pipeline.")
+        else:
+            try:
+                fast_probability = fast_score(originalUrl)
+            except Exception as e:
+                logging.error(f"Fast scoring failed for URL '{originalUrl}': {str(e)}")
+        low, high = FAST_UNCERTAIN_BAND
+        if fast_probability is not None and (not data.get("escalate", True) or not low <= fast_probability < high):
+            return jsonify({
+                'final_probability': fast_probability,
+                'model_probabilities': {'lexical_model': fast_probability},
+                'shap_explanations': {'top_safe': [], 'top_unsafe': []},
+                'cached': False,
+                'mode': 'fast',
+                'escalated': False,
+            })
+
+    # Per-request timings, returned when the request asks for them
+    trace = {} if data.get("trace") else None
+
+    # Concurrent requests for the same URL share one computation
+    computed = False
+    def compute():
+        nonlocal computed
+        computed = True
+        return score_url(originalUrl, trace)
+
+    try:
+        result = prediction_cache.get_or_compute(normalize_url(originalUrl), compute)
+    except FeatureColumnsError as e:
+        logging.error("Feature extraction produced incorrect columns.")
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        logging.error(f"Feature extraction failed for URL '{originalUrl}': {str(e)}")
+        return jsonify({'error': 'Feature extraction failed', 'details': str(e)}), 500
+
+    if not computed:
+        logging.info(f"Serving cached prediction for {originalUrl}.")
+
+    # Send final probability back to the extension
+    payload = {
+        'final_probability': result['final_probability'],
+        'model_probabilities': result['model_probabilities'],
+        'shap_explanations': result['shap_explanations'],
+        'cached': not computed,
+        'mode': 'full',
+        'escalated': fast_probability is not None,
+        'fast_probability': fast_probability,
+    }
+    if trace is not None:
+        logging.info(f"Trace for {originalUrl}: {trace}")
+        payload['trace'] = trace
+    response = jsonify(payload)
 
     # Display prediction result to user via extension
     logging.info("Displaying prediction result to extension.")
-    
-    # Start thread to prompt for actual prediction input and save data
-    threading.Thread(target=prompt_and_save_data, args=(originalUrl, df_features, final_probability)).start()
+
+    # Queue the sample for a ground-truth label, once per computed result
+    if computed and originalUrl not in sample_store:
+        labeling_queue.submit(originalUrl, result['features'].iloc[0].to_dict(), result['final_probability'])
 
     return response
 
-def prompt_and_save_data(url, df_features, final_probability):
-    # Prompt user for actual prediction (0 or 1)
-    actual_prediction = input(f"Please enter the actual prediction for URL '{url}' (0 for safe, 1 for phishing, -1 for other): ")
-    while actual_prediction not in ['0', '1', '-1']:
-        actual_prediction = input("Invalid input. Please enter 0 for safe, 1 for phishing or -1 for other: ")
+def _event(name, data):
+    """One server-sent event."""
+    return f"event: {name}\ndata: {json.dumps(data)}\n\n"
+
+def stream_prediction(originalUrl, deadline=REQUEST_DEADLINE):
+    """
+    Server-sent events for one URL. A 'lexical' event comes first with the
+    probability of the lexical model alone, or none when there is no
+    lexical model. An 'update' event follows whenever a network source
+    completes, with the ensemble's partial probability computed with the
+    sources that have not arrived at their fallback values. Both are marked
+    'checking' and are no verdict. A 'final' event then carries the same
+    result /predict returns, cached for later requests. An 'error' event
+    replaces the rest if scoring fails.
+    """
+    cache_key = normalize_url(originalUrl)
+    cached = prediction_cache.get(cache_key)
+    if cached is not None:
+        logging.info(f"Serving cached prediction for {originalUrl}.")
+        yield _event('final', {
+            'final_probability': cached['final_probability'],
+            'model_probabilities': cached['model_probabilities'],
+            'shap_explanations': cached['shap_explanations'],
+            'cached': True,
+        })
+        return
+
+    started = time.monotonic()
+    try:
+        features, futures = start_network_sources(originalUrl, deadline=started + deadline)
+        sources = [name for name in NETWORK_SOURCES if name not in futures.values()]
+        features.update(timed_lexical_features(originalUrl))
+        fallback = {name: value for _, values in NETWORK_SOURCES.values() for name, value in values.items()}
+
+        def pending():
+            return [name for name in futures.values() if name not in sources]
+
+        first = {'state': 'checking', 'pending': pending()}
+        if scoring.lexical_model is not None:
+            first['lexical_probability'] = lexical_probability(features)
+        yield _event('lexical', first)
+
+        for name, values in iter_network_features(originalUrl, futures, started + deadline):
+            features.update(values)
+            sources.append(name)
+            row = [[features.get(name, fallback.get(name)) for name in columns[3:]]]
+            partial_probability, model_probabilities = ensemble_probability(scale_features(np.array(row, dtype=float)))
+            yield _event('update', {
+                'state': 'checking',
+                'partial_probability': partial_probability,
+                'model_probabilities': model_probabilities,
+                'sources': list(sources),
+                'pending': pending(),
+            })
+
+        result = score_features(pd.DataFrame([{name: features[name] for name in FEATURE_NAMES}]))
+    except Exception as e:
+        logging.error(f"Streaming prediction failed for URL '{originalUrl}': {str(e)}")
+        yield _event('error', {'error': 'Feature extraction failed', 'details': str(e)})
+        return
+
+    prediction_cache.set(cache_key, result)
+    if originalUrl not in sample_store:
+        labeling_queue.submit(originalUrl, result['features'].iloc[0].to_dict(), result['final_probability'])
+    yield _event('final', {
+        'final_probability': result['final_probability'],
+        'model_probabilities': result['model_probabilities'],
+        'shap_explanations': result['shap_explanations'],
+        'cached': False,
+    })
+
+@app.route('/predict_stream', methods=['POST'])
+def predict_stream():
+    data = request.get_json()
+    originalUrl = data.get("url") if data else None
+    if not originalUrl:
+        return jsonify({'error': 'URL is required'}), 400
+    try:
+        # A malformed URL is rejected before the event stream starts
+        normalize_url(originalUrl)
+    except Exception as e:
+        return jsonify({'error': 'Invalid URL', 'details': str(e)}), 400
+
+    logging.info(f"Received URL for streaming: {originalUrl}")
+    return Response(
+        stream_prediction(originalUrl),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+@app.route('/predict_batch', methods=['POST'])
+def predict_batch():
+    data = request.get_json()
+    urls = data.get("urls") if data else None
+    if not isinstance(urls, list) or not urls:
+        return jsonify({'error': 'A non-empty list of URLs is required'}), 400
+    if len(urls) > MAX_BATCH_SIZE:
+        return jsonify({'error': f'At most {MAX_BATCH_SIZE} URLs can be scored per batch'}), 400
+
+    logging.info(f"Received batch of {len(urls)} URLs")
+    results = [None] * len(urls)
+
+    # Reuse cached predictions and extract features concurrently for the rest
+    pending = {}
+    for index, url in enumerate(urls):
+        if not isinstance(url, str) or not url:
+            results[index] = {'url': url, 'error': 'URL is required'}
+            continue
+        try:
+            cached = prediction_cache.get(normalize_url(url))
+        except Exception as e:
+            # A malformed URL fails on its own, the rest of the batch is scored
+            results[index] = {'url': url, 'error': str(e)}
+            continue
+        if cached is not None:
+            results[index] = {
+                'url': url,
+                'final_probability': cached['final_probability'],
+                'model_probabilities': cached['model_probabilities'],
+                'cached': True,
+            }
+        else:
+            pending[index] = _batch_executor.submit(extract_features, url)
+
+    # Feature rows of the URLs whose extraction succeeded
+    feature_columns = columns[3:]
+    rows = {}
+    for index, future in pending.items():
+        try:
+            rows[index] = future.result()[feature_columns].to_numpy(dtype=float)
+        except Exception as e:
+            logging.error(f"Feature extraction failed for URL '{urls[index]}': {str(e)}")
+            results[index] = {'url': urls[index], 'error': str(e)}
+
+    if rows:
+        # Stack every feature row into one matrix for a single scaling and model pass
+        indices = list(rows)
+        matrix = np.vstack([rows[index] for index in indices])
+        probabilities = predict_probabilities(scale_features(matrix))
+
+        for row, index in enumerate(indices):
+            model_probabilities = {
+                model_name: float(values[row]) if values is not None else None
+                for model_name, values in probabilities.items()
+            }
+            valid_probabilities = [prob for prob in model_probabilities.values() if prob is not None]
+            results[index] = {
+                'url': urls[index],
+                'final_probability': float(np.mean(valid_probabilities)) if valid_probabilities else None,
+                'model_probabilities': model_probabilities,
+                'cached': False,
+            }
+
+    return jsonify({'results': results})
+
+@app.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    body, content_type = metrics.render()
+    return Response(body, content_type=content_type)
+
+@app.route('/health', methods=['GET'])
+def health():
+    return jsonify({
+        'status': 'ok',
+        'startup_seconds': startup_timings,
+        'compiled_inference': scoring.compiled_ensemble is not None,
+        'fast_mode': scoring.lexical_model is not None,
+        'explainers_loaded': _explainers is not None,
+        'circuits': circuit_breaker.states(),
+    })
+
+@app.route('/labels/pending', methods=['GET'])
+def pending_labels():
+    limit = request.args.get('limit', default=100, type=int)
+    return jsonify({'count': labeling_queue.count(), 'pending': labeling_queue.pending(limit)})
+
+@app.route('/labels', methods=['POST'])
+def submit_label():
+    data = request.get_json()
+    url = data.get("url") if data else None
+    actual = data.get("actual") if data else None
+    if not url:
+        return jsonify({'error': 'URL is required'}), 400
+    # bool is a subclass of int and 1.0 == 1, neither is a label
+    if type(actual) is not int or actual not in LABELS:
+        return jsonify({'error': 'actual must be 0 for safe, 1 for phishing or -1 for other'}), 400
+
+    sample = labeling_queue.get(url)
+    if sample is None:
+        return jsonify({'error': f'{url} is not waiting for a label'}), 404
+    features, final_probability = sample
 
     # Convert actual prediction to integer and save to DataFrame
-    df_features['actual'] = int(actual_prediction)
-    logging.info(f"User entered actual prediction: {actual_prediction}")
+    df_features = pd.DataFrame([features])
+    df_features['actual'] = int(actual)
+    logging.info(f"User entered actual prediction for {url}: {actual}")
 
-    # Save data if new
-    save_data_if_new(url, df_features, final_probability)
+    # Save data if new; the sample stays pending until its row is stored
+    if not save_data_if_new(url, df_features, final_probability):
+        return jsonify({'error': f'Failed to save the label of {url}'}), 500
+    labeling_queue.remove(url)
+    return jsonify({'message': f'{url} labeled as {actual}.'})
 
 def save_data_if_new(url, df_features, final_probability):
+    """Queue the labeled row unless the URL is already in the dataset; returns False if that failed."""
     try:
-        # Load existing data
-        existing_data = pd.read_csv(DATA_PATH)
-
-        # Check if the URL is already present
-        if url in existing_data['url'].values:
+        # Check the in-memory index instead of reading the dataset
+        if url in sample_store:
             logging.info(f"{url} is already present in the dataset.\n")
         else:
-            # Prepare and append new data row with the specified column order
+            # Prepare and queue the new data row; the store writes it in column order
             row_data = {col: df_features.iloc[0].get(col, None) for col in columns[3:]}
             row_data.update({"url": url, "status": final_probability, "actual": df_features['actual'].values[0]})
-            pd.DataFrame([row_data], columns=columns).to_csv(DATA_PATH, mode='a', header=False, index=False)
-            logging.info(f"{url} has been added to the dataset.\n")
+            if sample_store.add(row_data):
+                logging.info(f"{url} has been added to the dataset.\n")
+            else:
+                logging.info(f"{url} is already present in the dataset.\n")
+        return True
     except Exception as e:
         logging.error(f"Failed to save data for {url}. Reason: {str(e)}\n")
+        return False
+
+startup_timings['total'] = round(time.perf_counter() - _startup_clock, 3)
+logging.info(f"Startup finished in {startup_timings['total']:.3f}s.")
 
 if __name__ == '__main__':
     logging.info("Starting Flask app...")
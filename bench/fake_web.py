@@ -0,0 +1,235 @@
+import json
+import os
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.parse import parse_qs, urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+import dns_resolver
+import http_client
+from domain_parser import host_from_netloc, registrable_domain
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+SITES_PATH = os.path.join(FIXTURES_DIR, 'sites.json')
+SERVICES = ('page', 'search', 'traffic', 'whois', 'dns')
+SEARCH_HOST = 'www.google.com'
+TRAFFIC_HOST = 'www.similarweb.com'
+ORIGINAL_URL_HEADER = 'X-Original-Url'  # Where the routing adapter keeps the requested URL
+
+class FakeWeb:
+    """
+    Local HTTP server standing in for every external service the feature
+    extractor talks to: the fetched pages, Google search, SimilarWeb, WHOIS
+    and DNS. Answers come from the fixture file. Every service has its own
+    injected latency (latency_ms +/- jitter_ms) and failure rate, drawn from
+    a seeded generator so that runs can be reproduced.
+    """
+
+    def __init__(self, sites_path=SITES_PATH, services=None, seed=0):
+        with open(sites_path, encoding='utf-8') as f:
+            fixtures = json.load(f)
+        self.services = {name: dict(fixtures['services'].get(name, {})) for name in SERVICES}
+        for name, overrides in (services or {}).items():
+            self.services[name].update(overrides)
+        self.sites = fixtures['sites']
+        self._by_host = {}
+        self._by_domain = {}
+        self._pages = {}
+        for site in self.sites:
+            netloc = urlparse(site['url']).netloc
+            self._by_host[host_from_netloc(netloc)] = site
+            self._by_domain[registrable_domain(netloc)] = site
+            if site.get('page') and site['page'] not in self._pages:
+                with open(os.path.join(FIXTURES_DIR, 'pages', site['page']), 'rb') as f:
+                    self._pages[site['page']] = f.read()
+        self.requests = Counter()  # Requests answered per service
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._server = None
+        self._stub_session = requests.Session()
+        self._stub_session.mount('http://', HTTPAdapter(pool_maxsize=64))
+        self.base_url = None
+
+    @property
+    def urls(self):
+        return [site['url'] for site in self.sites]
+
+    def start(self):
+        """Serve on a free local port in a background thread and return the base URL."""
+        handler = type('Handler', (_Handler,), {'web': self})
+        self._server = _Server(('127.0.0.1', 0), handler)
+        threading.Thread(target=self._server.serve_forever, name='fake-web', daemon=True).start()
+        self.base_url = f"http://127.0.0.1:{self._server.server_address[1]}"
+        return self.base_url
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def install(self):
+        """Route the extractor's HTTP client, WHOIS lookups and DNS resolution to this server."""
+        import feature_extract
+        adapter = RoutingAdapter(self)
+        http_client.session.mount('http://', adapter)
+        http_client.session.mount('https://', adapter)
+        feature_extract.whois = SimpleNamespace(whois=self.whois)
+        dns_resolver.socket = _ResolverSocket(self)
+
+    def resolvable(self, host):
+        site = self._by_host.get(host)
+        return site is None or site.get('ip') is not None or _is_ip(host)
+
+    def delay(self, service):
+        """Sleep for the service's latency and return whether this call fails."""
+        config = self.services[service]
+        with self._lock:
+            latency = config.get('latency_ms', 0) + self._rng.uniform(-1, 1) * config.get('jitter_ms', 0)
+            failed = self._rng.random() < config.get('failure_rate', 0)
+            self.requests[service] += 1
+        time.sleep(max(0, latency) / 1000)
+        return failed
+
+    def answer(self, url):
+        """(status, content type, body) for a GET of `url`."""
+        parsed = urlparse(url)
+        host = host_from_netloc(parsed.netloc)
+        if host == SEARCH_HOST:
+            if self.delay('search'):
+                return 500, 'text/plain', b'search unavailable'
+            target = parse_qs(parsed.query).get('q', [''])[0].partition('site:')[2]
+            site = self._by_host.get(host_from_netloc(target))
+            results = f'<a href="{site["url"]}">{site["url"]}</a>' if site and site['indexed'] else 'No results found.'
+            return 200, 'text/html', f'<html><body><div id="search">{results}</div></body></html>'.encode()
+        if host == TRAFFIC_HOST:
+            if self.delay('traffic'):
+                return 500, 'text/plain', b'traffic unavailable'
+            # The analysed URL is embedded whole in the path: /website/<url>/
+            target = url.partition('/website/')[2].rstrip('/')
+            site = self._by_host.get(host_from_netloc(urlparse(target).netloc))
+            if site is None:
+                return 404, 'text/plain', b'not found'
+            return 200, 'text/html', f'<html><body><span class="totalVisits">{site["visits"]:,}</span></body></html>'.encode()
+        if self.delay('page'):
+            return 500, 'text/plain', b'page unavailable'
+        site = self._by_host.get(host)
+        if site is None or not site.get('page'):
+            return 404, 'text/html', b'<html><body><h1>Not Found</h1></body></html>'
+        return site.get('status', 200), 'text/html; charset=utf-8', self._pages[site['page']]
+
+    def whois_answer(self, domain):
+        if self.delay('whois'):
+            return 500, None
+        site = self._by_domain.get(domain)
+        if site is None or not site.get('whois'):
+            return 404, None
+        return 200, site['whois']
+
+    def dns_answer(self, host):
+        if self.delay('dns'):
+            return 500, None
+        site = self._by_host.get(host)
+        if site is None or not site.get('ip'):
+            return 404, None
+        return 200, site['ip']
+
+    def whois(self, domain):
+        # Stand-in for whois.whois(): dates of the fixture record, None for
+        # unknown domains, an exception when the server fails
+        response = self._stub_session.get(f"{self.base_url}/_whois", params={'domain': domain}, timeout=30)
+        if response.status_code == 404:
+            return SimpleNamespace(creation_date=None, expiration_date=None)
+        response.raise_for_status()
+        record = response.json()
+        return SimpleNamespace(
+            creation_date=datetime.fromisoformat(record['created']),
+            expiration_date=datetime.fromisoformat(record['expires']),
+        )
+
+    def getaddrinfo(self, host, port, *args, **kwargs):
+        # Stand-in for socket.getaddrinfo(): one A record, a missing name, or
+        # a temporary failure when the server fails
+        response = self._stub_session.get(f"{self.base_url}/_dns", params={'host': host}, timeout=30)
+        if response.status_code == 404:
+            raise socket.gaierror(socket.EAI_NONAME, 'Name or service not known')
+        if response.status_code != 200:
+            raise socket.gaierror(socket.EAI_AGAIN, 'Temporary failure in name resolution')
+        return [(socket.AF_INET, socket.SOCK_STREAM, socket.IPPROTO_TCP, '', (response.json(), port or 0))]
+
+class _ResolverSocket:
+    """The socket module as seen by dns_resolver, with getaddrinfo answered by the fake web."""
+
+    def __init__(self, web):
+        self.getaddrinfo = web.getaddrinfo
+
+    def __getattr__(self, name):
+        return getattr(socket, name)
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # Clients hang up on purpose, for instance after a truncated download
+        pass
+
+class _Handler(BaseHTTPRequestHandler):
+    web = None  # Set on the subclass built by FakeWeb.start
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like real servers
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        if parsed.path == '/_whois':
+            status, record = self.web.whois_answer(query.get('domain', [''])[0])
+            self._send(status, 'application/json', json.dumps(record).encode())
+        elif parsed.path == '/_dns':
+            status, address = self.web.dns_answer(query.get('host', [''])[0])
+            self._send(status, 'application/json', json.dumps(address).encode())
+        else:
+            self._send(*self.web.answer(self.headers.get(ORIGINAL_URL_HEADER, '')))
+
+    def _send(self, status, content_type, body):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+class RoutingAdapter(HTTPAdapter):
+    """
+    Transport adapter sending every request to the fake web server, with
+    the requested URL in a header. Hosts without an address in the fixtures
+    fail like a DNS error.
+    """
+
+    def __init__(self, web):
+        super().__init__(pool_connections=1, pool_maxsize=64, max_retries=http_client.RETRY_POLICY)
+        self.web = web
+
+    def send(self, request, **kwargs):
+        url = request.url
+        host = host_from_netloc(urlparse(url).netloc)
+        if not self.web.resolvable(host):
+            raise requests.exceptions.ConnectionError(f"Failed to resolve '{host}'", request=request)
+        request.url = f"{self.web.base_url}/fetch"
+        request.headers[ORIGINAL_URL_HEADER] = url
+        response = super().send(request, **kwargs)
+        response.url = url
+        return response
+
+def _is_ip(host):
+    try:
+        socket.inet_pton(socket.AF_INET6 if ':' in host else socket.AF_INET, host)
+        return True
+    except OSError:
+        return False
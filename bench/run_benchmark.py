@@ -0,0 +1,303 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timezone
+
+import numpy as np
+import psutil
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+sys.path.insert(0, REPO_ROOT)
+
+from fake_web import SERVICES, FakeWeb
+
+PERCENTILES = (50, 90, 95, 99)
+LEXICAL_REPEATS = 200  # Passes over the fixture URLs when timing the lexical features alone
+
+# Metrics printed and compared, as (section, key)
+HEADLINE_METRICS = [
+    ('single_url', 'p50_ms'), ('single_url', 'p95_ms'), ('single_url', 'p99_ms'),
+    ('predict', 'p50_ms'), ('predict', 'p95_ms'), ('predict', 'p99_ms'),
+    ('batch', 'urls_per_second'), ('predict_batch', 'urls_per_second'),
+    ('lexical', 'us_per_url'),
+    ('memory', 'rss_mb'), ('memory', 'batch_peak_traced_mb'),
+    ('cpu', 'ms_per_url'),
+]
+
+def summarize(samples):
+    """Count, mean, percentiles and maximum of latencies in seconds, in milliseconds."""
+    values = np.asarray(samples) * 1000
+    summary = {'count': len(values), 'mean_ms': round(float(values.mean()), 2)}
+    for percentile in PERCENTILES:
+        summary[f'p{percentile}_ms'] = round(float(np.percentile(values, percentile)), 2)
+    summary['max_ms'] = round(float(values.max()), 2)
+    return summary
+
+def _cpu_seconds():
+    times = psutil.Process().cpu_times()
+    return times.user + times.system
+
+def _service_overrides(args):
+    # --latency page=50 --failure-rate whois=0.5 ... -> {'page': {'latency_ms': 50.0}, ...}
+    overrides = {}
+    for option, key in (('latency', 'latency_ms'), ('jitter', 'jitter_ms'), ('failure_rate', 'failure_rate')):
+        for assignment in getattr(args, option) or []:
+            service, _, value = assignment.partition('=')
+            if service not in SERVICES:
+                raise SystemExit(f"Unknown service '{service}', expected one of {', '.join(SERVICES)}")
+            overrides.setdefault(service, {})[key] = float(value)
+    if args.no_latency:
+        for service in SERVICES:
+            overrides.setdefault(service, {}).update(latency_ms=0, jitter_ms=0)
+    return overrides
+
+class Benchmark:
+    """
+    Runs the backend against the fake web and collects the measurements of
+    the report. Unless `warm`, every cache is emptied before each URL so that
+    every extraction pays for its network sources.
+    """
+
+    def __init__(self, web, iterations, batch_repeats, warm=False, predict=True):
+        import feature_extract
+        self.fe = feature_extract
+        self.web = web
+        self.iterations = iterations
+        self.batch_repeats = batch_repeats
+        self.warm = warm
+        self.app = None
+        if predict:
+            import app
+            self.app = app
+        if not warm:
+            # Domain results would otherwise be shared between URLs of the same site
+            feature_extract.domain_store = None
+
+    def _reset(self):
+        if self.warm:
+            return
+        self.fe._whois_cache.clear()
+        self.fe.dns_resolver._dns_cache.clear()
+        if self.app is not None:
+            self.app.prediction_cache.clear()
+
+    def single_url(self):
+        latencies = []
+        for _ in range(self.iterations):
+            for url in self.web.urls:
+                self._reset()
+                started = time.perf_counter()
+                self.fe.extract_features(url)
+                latencies.append(time.perf_counter() - started)
+        return summarize(latencies)
+
+    def predict(self):
+        client = self.app.app.test_client()
+        # The first request builds the SHAP explainers, which is startup work
+        client.post('/predict', json={'url': self.web.urls[0]})
+        latencies = []
+        for _ in range(self.iterations):
+            for url in self.web.urls:
+                self._reset()
+                started = time.perf_counter()
+                response = client.post('/predict', json={'url': url})
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    logging.warning(f"/predict answered {response.status_code} for {url}")
+        return summarize(latencies)
+
+    def batch(self, trace_memory=False):
+        urls = self.web.urls * self.batch_repeats
+        self._reset()
+        if trace_memory:
+            tracemalloc.start()
+        started = time.perf_counter()
+        self.fe.extract_features_batch(urls)
+        elapsed = time.perf_counter() - started
+        result = {'urls': len(urls), 'seconds': round(elapsed, 3), 'urls_per_second': round(len(urls) / elapsed, 2)}
+        if trace_memory:
+            result['peak_traced_mb'] = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+            tracemalloc.stop()
+        return result
+
+    def predict_batch(self):
+        client = self.app.app.test_client()
+        urls = self.web.urls * self.batch_repeats
+        limit = self.app.MAX_BATCH_SIZE
+        self._reset()
+        started = time.perf_counter()
+        for start in range(0, len(urls), limit):
+            client.post('/predict_batch', json={'urls': urls[start:start + limit]})
+        elapsed = time.perf_counter() - started
+        return {'urls': len(urls), 'seconds': round(elapsed, 3), 'urls_per_second': round(len(urls) / elapsed, 2)}
+
+    def lexical(self):
+        urls = self.web.urls * LEXICAL_REPEATS
+        started = time.perf_counter()
+        self.fe.extract_lexical_features_batch(urls)
+        elapsed = time.perf_counter() - started
+        return {'urls': len(urls), 'us_per_url': round(elapsed / len(urls) * 1e6, 2)}
+
+def _histogram_means(histogram, label):
+    # Mean wall/CPU time per label value, from the _sum and _count samples
+    totals = {}
+    for metric in histogram.collect():
+        for sample in metric.samples:
+            if sample.name.endswith(('_sum', '_count')):
+                kind = 'sum' if sample.name.endswith('_sum') else 'count'
+                totals.setdefault(sample.labels[label], {})[kind] = sample.value
+    return {
+        name: {'count': int(total['count']), 'mean_ms': round(total['sum'] / total['count'] * 1000, 3)}
+        for name, total in sorted(totals.items()) if total.get('count')
+    }
+
+def feature_timings():
+    """Per-feature and per-source means over every extraction of the run."""
+    import metrics
+    sources = _histogram_means(metrics.SOURCE_SECONDS, 'source')
+    for name, cpu in _histogram_means(metrics.SOURCE_CPU_SECONDS, 'source').items():
+        sources[name]['cpu_mean_ms'] = cpu['mean_ms']
+    outcomes = {}
+    for metric in metrics.SOURCE_RESULTS.collect():
+        for sample in metric.samples:
+            if sample.name.endswith('_total'):
+                outcomes.setdefault(sample.labels['source'], {})[sample.labels['outcome']] = int(sample.value)
+    for name, counts in outcomes.items():
+        sources.setdefault(name, {})['outcomes'] = counts
+    return {'features': _histogram_means(metrics.FEATURE_SECONDS, 'feature'), 'sources': sources}
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+def _scratch_directory():
+    # The backend keeps its data files (samples, labeling queue, domain cache,
+    # model bundle) in the working directory; a scratch one with links to the
+    # model files keeps benchmark URLs out of the real ones
+    directory = tempfile.mkdtemp(prefix='clicksafe-bench-')
+    for name in os.listdir(REPO_ROOT):
+        if name.endswith('.pkl'):
+            os.symlink(os.path.join(REPO_ROOT, name), os.path.join(directory, name))
+    return directory
+
+def run(args):
+    web = FakeWeb(services=_service_overrides(args), seed=args.seed)
+    web.start()
+    web.install()
+    benchmark = Benchmark(web, args.iterations, args.batch_repeats, warm=args.warm, predict=not args.skip_predict)
+    process = psutil.Process()
+
+    report = {
+        'meta': {
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'config': {
+                'iterations': args.iterations,
+                'batch_repeats': args.batch_repeats,
+                'warm': args.warm,
+                'seed': args.seed,
+                'urls': len(web.urls),
+                'services': web.services,
+            },
+        },
+    }
+
+    cpu_started = _cpu_seconds()
+    print("Timing single URL extraction...", file=sys.stderr)
+    report['single_url'] = benchmark.single_url()
+    report['cpu'] = {'ms_per_url': round((_cpu_seconds() - cpu_started) / report['single_url']['count'] * 1000, 2)}
+    print("Timing batch extraction...", file=sys.stderr)
+    report['batch'] = benchmark.batch()
+    report['lexical'] = benchmark.lexical()
+    if benchmark.app is not None:
+        print("Timing /predict and /predict_batch...", file=sys.stderr)
+        report['predict'] = benchmark.predict()
+        report['predict_batch'] = benchmark.predict_batch()
+    # A separate pass, as tracing allocations slows everything down
+    report['memory'] = {
+        'batch_peak_traced_mb': benchmark.batch(trace_memory=True)['peak_traced_mb'],
+        'rss_mb': round(process.memory_info().rss / 2**20, 2),
+    }
+    report.update(feature_timings())
+    report['fake_web_requests'] = dict(web.requests)
+    web.stop()
+    return report
+
+def _headline(report):
+    return {
+        f'{section}.{key}': report[section][key]
+        for section, key in HEADLINE_METRICS if key in report.get(section, {})
+    }
+
+def compare(baseline_path, current_path):
+    """Print the headline metrics of two reports side by side."""
+    with open(baseline_path) as f:
+        baseline = _headline(json.load(f))
+    with open(current_path) as f:
+        current = _headline(json.load(f))
+    print(f"{'metric':32} {'baseline':>12} {'current':>12} {'change':>9}")
+    for name in baseline:
+        if name not in current:
+            continue
+        change = f"{(current[name] - baseline[name]) / baseline[name] * 100:+.1f}%" if baseline[name] else 'n/a'
+        print(f"{name:32} {baseline[name]:>12} {current[name]:>12} {change:>9}")
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Benchmark the ClickSafe feature extraction and prediction against a local fake web.'
+    )
+    parser.add_argument('--iterations', type=int, default=3, help='Passes over the fixture URLs for the latency runs')
+    parser.add_argument('--batch-repeats', type=int, default=4, help='Copies of the fixture URLs in each batch')
+    parser.add_argument('--seed', type=int, default=0, help='Seed of the injected latency and failures')
+    parser.add_argument('--latency', action='append', metavar='SERVICE=MS', help='Override a service latency')
+    parser.add_argument('--jitter', action='append', metavar='SERVICE=MS', help='Override a service jitter')
+    parser.add_argument('--failure-rate', action='append', metavar='SERVICE=P', help='Override a service failure rate')
+    parser.add_argument('--no-latency', action='store_true', help='Answer instantly, to measure CPU-bound work')
+    parser.add_argument('--warm', action='store_true', help='Keep the caches between URLs')
+    parser.add_argument('--skip-predict', action='store_true', help='Skip the endpoints, which load the models')
+    parser.add_argument('--output', help='Report path (default: bench/results/<timestamp>.json)')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'), help='Compare two reports and exit')
+    args = parser.parse_args()
+    # Keep the per-request INFO logs of the backend out of the output
+    logging.basicConfig(level=logging.WARNING)
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    output = os.path.abspath(args.output or os.path.join(
+        RESULTS_DIR, datetime.now().strftime('%Y%m%d-%H%M%S') + '.json'
+    ))
+    directory = _scratch_directory()
+    os.chdir(directory)
+    try:
+        report = run(args)
+    finally:
+        os.chdir(REPO_ROOT)
+        shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    for name, value in _headline(report).items():
+        print(f"{name:32} {value:>12}")
+    print(f"Report written to {output}")
+
+if __name__ == '__main__':
+    main()
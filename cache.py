@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import metrics
+
+_MISSING = object()
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with a per-entry time to live and an LRU
+    size limit. Concurrent get_or_compute calls for the same key share a
+    single in-flight computation. Lookups of a named cache are counted in
+    the cache metrics.
+    """
+
+    def __init__(self, maxsize, ttl, name=None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.name = name
+        self._hits = metrics.CACHE_REQUESTS.labels(name, 'hit') if name else None
+        self._misses = metrics.CACHE_REQUESTS.labels(name, 'miss') if name else None
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}  # key -> Future of the running computation
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def _lookup(self, key):
+        # Must be called with the lock held
+        value = self._find(key)
+        if self.name:
+            (self._misses if value is _MISSING else self._hits).inc()
+        return value
+
+    def _find(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return _MISSING
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return _MISSING
+        self._entries.move_to_end(key)
+        return value
+
+    def _store(self, key, value, ttl):
+        # Must be called with the lock held
+        if callable(ttl):
+            ttl = ttl(value)
+        if ttl is None:
+            ttl = self.ttl
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def get(self, key, default=None):
+        with self._lock:
+            value = self._lookup(key)
+        return default if value is _MISSING else value
+
+    def set(self, key, value, ttl=None):
+        """Store `value`; `ttl` may be a number of seconds or a function of the value."""
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def pop(self, key, default=None):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+        return default if entry is None else entry[1]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def get_or_compute(self, key, compute, ttl=None):
+        """
+        Return the cached value for `key`, calling `compute()` on a miss.
+        Callers arriving while the computation runs wait for its result
+        instead of starting their own. Exceptions are propagated to every
+        waiting caller and are not cached.
+        """
+        with self._lock:
+            value = self._lookup(key)
+            if value is not _MISSING:
+                return value
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._inflight[key] = future
+        if not owner:
+            return future.result()
+
+        try:
+            value = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._inflight[key]
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._store(key, value, ttl)
+            del self._inflight[key]
+        future.set_result(value)
+        return value
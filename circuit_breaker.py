@@ -0,0 +1,177 @@
+import logging
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+import requests
+
+import metrics
+
+CLOSED = 'closed'  # Calls go through
+HALF_OPEN = 'half_open'  # Single probe calls test whether the provider recovered
+OPEN = 'open'  # Calls fail at once with CircuitOpenError
+
+# Gauge values of the states
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Statuses meaning a provider is throttling, blocking or failing us
+BLOCKED_STATUSES = frozenset({403, 429, 500, 502, 503, 504})
+
+DEFAULT_SETTINGS = {
+    'window': 20,  # Recent calls the rates are computed over
+    'min_calls': 10,  # Calls needed in the window before the circuit can open
+    'failure_rate': 0.5,  # Share of failed calls opening the circuit
+    'slow_call_seconds': 2.5,  # Calls taking longer count as slow
+    'slow_rate': 0.8,  # Share of slow calls opening the circuit, None to ignore latency
+    'open_seconds': 30,  # Time before the first probe
+    'max_open_seconds': 5 * 60,  # Cap of the open time, doubled after every failed probe
+    'probes': 2,  # Successful probes, made one at a time, closing the circuit
+    'failure_statuses': BLOCKED_STATUSES,  # Response statuses counted as failures
+}
+
+# Settings of each external provider, overriding DEFAULT_SETTINGS
+PROVIDERS = {
+    'google': {},
+    'similarweb': {},
+    'whois': {},
+    # Analysed sites are often down or slow on their own, so only a near-total
+    # failure rate (our network being cut off) opens this one, and their
+    # error statuses are answers rather than failures
+    'page': {'min_calls': 50, 'window': 100, 'failure_rate': 0.9, 'slow_rate': None, 'failure_statuses': frozenset()},
+}
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling a provider whose circuit is open."""
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one external provider. The outcome and duration of
+    the recent calls are kept in a window; once enough of them failed or
+    were slow the circuit opens and calls are refused at once. After
+    `open_seconds` it turns half-open and lets one probe call through at a
+    time: `probes` successes close it, a failure opens it again for twice as
+    long (up to `max_open_seconds`).
+
+    State is per process, so every worker learns a provider's health on its own.
+    """
+
+    def __init__(self, name, **settings):
+        self.name = name
+        settings = {**DEFAULT_SETTINGS, **settings}
+        self.window = settings['window']
+        self.min_calls = settings['min_calls']
+        self.failure_rate = settings['failure_rate']
+        self.slow_call_seconds = settings['slow_call_seconds']
+        self.slow_rate = settings['slow_rate']
+        self.open_seconds = settings['open_seconds']
+        self.max_open_seconds = settings['max_open_seconds']
+        self.probes = settings['probes']
+        self.failure_statuses = settings['failure_statuses']
+        self.state = CLOSED
+        self._calls = deque(maxlen=self.window)  # (failed, slow) of the recent calls
+        self._opened_at = 0
+        self._open_for = self.open_seconds
+        self._generation = 0  # Number of state changes, telling calls allowed in an earlier state apart
+        self._probing = False  # A half-open probe is in flight
+        self._probe_successes = 0
+        self._lock = threading.Lock()
+        metrics.CIRCUIT_STATE.labels(name).set(STATE_VALUES[CLOSED])
+
+    def _set_state(self, state):
+        # Must be called with the lock held
+        self.state = state
+        self._generation += 1
+        metrics.CIRCUIT_STATE.labels(self.name).set(STATE_VALUES[state])
+        metrics.CIRCUIT_TRANSITIONS.labels(self.name, state).inc()
+        if state == OPEN:
+            self._opened_at = time.monotonic()
+            logging.warning(f"Circuit for {self.name} opened for {self._open_for}s.")
+        else:
+            logging.info(f"Circuit for {self.name} is {state.replace('_', '-')}.")
+
+    def allow(self):
+        """
+        Permit for a call to the provider now, or None if the circuit refuses
+        it. Every permitted call must be recorded with its permit.
+        """
+        with self._lock:
+            if self.state == OPEN and time.monotonic() - self._opened_at >= self._open_for:
+                self._probe_successes = 0
+                self._set_state(HALF_OPEN)
+            if self.state == CLOSED:
+                return (CLOSED, self._generation)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return (HALF_OPEN, self._generation)
+        metrics.CIRCUIT_REJECTIONS.labels(self.name).inc()
+        return None
+
+    def record(self, permit, success, seconds):
+        """Record the outcome and duration of a call made with a permit from allow()."""
+        slow = seconds >= self.slow_call_seconds
+        metrics.PROVIDER_CALLS.labels(self.name, 'success' if success else 'failure').inc()
+        state, generation = permit
+        with self._lock:
+            if generation != self._generation:
+                # Allowed in an earlier state, e.g. before the circuit opened:
+                # it neither counts as the probe nor in the new window
+                return
+            if state == HALF_OPEN:
+                self._probing = False
+                if not success:
+                    self._open_for = min(self._open_for * 2, self.max_open_seconds)
+                    self._set_state(OPEN)
+                    return
+                self._probe_successes += 1
+                if self._probe_successes >= self.probes:
+                    self._calls.clear()
+                    self._open_for = self.open_seconds
+                    self._set_state(CLOSED)
+                return
+            self._calls.append((not success, slow))
+            if len(self._calls) < self.min_calls:
+                return
+            failures = sum(failed for failed, _ in self._calls) / len(self._calls)
+            slow_calls = sum(slow for _, slow in self._calls) / len(self._calls)
+            if failures >= self.failure_rate or (self.slow_rate is not None and slow_calls >= self.slow_rate):
+                self._set_state(OPEN)
+
+    @contextmanager
+    def guard(self, answered=()):
+        """
+        Run the block as a call to the provider: raise CircuitOpenError if the
+        circuit refuses it, otherwise record its duration and whether it
+        raised. Exceptions of the `answered` types are the provider's answer
+        and count as successes.
+        """
+        permit = self.allow()
+        if permit is None:
+            raise CircuitOpenError(f"Circuit for {self.name} is open")
+        started = time.monotonic()
+        success = False
+        try:
+            yield
+            success = True
+        except answered:
+            success = True
+            raise
+        finally:
+            self.record(permit, success, time.monotonic() - started)
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def get_breaker(provider):
+    """The circuit breaker of `provider`, created on first use from PROVIDERS."""
+    breaker = _breakers.get(provider)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(provider)
+            if breaker is None:
+                breaker = _breakers[provider] = CircuitBreaker(provider, **PROVIDERS.get(provider, {}))
+    return breaker
+
+def states():
+    """Current state of every provider's breaker."""
+    return {provider: breaker.state for provider, breaker in sorted(_breakers.items())}
@@ -0,0 +1,69 @@
+import logging
+import socket
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from cache import TTLCache
+
+LOOKUP_TIMEOUT = 2  # Seconds a lookup may take before the host counts as unresolved
+RESOLVER_WORKERS = 16  # Threads running the blocking system resolver
+DNS_CACHE_SIZE = 50000  # Maximum number of hosts kept in memory
+# The system resolver does not report record TTLs, so answers are kept for
+# fixed times: addresses for a typical record TTL, missing names for a
+# typical negative-caching TTL, and failures only long enough to stop a
+# stalled resolver from being queried again by every concurrent request
+DNS_TTL = 5 * 60
+DNS_NEGATIVE_TTL = 60
+DNS_FAILURE_TTL = 10
+
+RESOLVED = 'resolved'  # At least one A or AAAA record
+NOT_FOUND = 'not_found'  # The name does not exist or has no address
+FAILED = 'failed'  # The resolver failed or missed the deadline
+
+# Outcome of a lookup with the IPv4 (A) and IPv6 (AAAA) addresses found
+Resolution = namedtuple('Resolution', ['outcome', 'a', 'aaaa'])
+
+_TTLS = {RESOLVED: DNS_TTL, NOT_FOUND: DNS_NEGATIVE_TTL, FAILED: DNS_FAILURE_TTL}
+# Errors meaning the name has no address, as opposed to a resolver failure
+_NOT_FOUND_ERRORS = {socket.EAI_NONAME, getattr(socket, 'EAI_NODATA', socket.EAI_NONAME)}
+
+_resolver_executor = ThreadPoolExecutor(max_workers=RESOLVER_WORKERS, thread_name_prefix='dns')
+_dns_cache = TTLCache(maxsize=DNS_CACHE_SIZE, ttl=DNS_TTL, name='dns')
+
+def _normalize(host):
+    return host.lower().rstrip('.')
+
+def _getaddrinfo(host):
+    # Runs on the resolver pool, where a stalled lookup only holds its own thread
+    try:
+        infos = socket.getaddrinfo(host, None, proto=socket.IPPROTO_TCP)
+    except socket.gaierror as e:
+        return Resolution(NOT_FOUND if e.errno in _NOT_FOUND_ERRORS else FAILED, (), ())
+    except (UnicodeError, ValueError):
+        # Labels too long or not encodable cannot exist
+        return Resolution(NOT_FOUND, (), ())
+    # Unique addresses, in the resolver's order of preference
+    a = tuple(dict.fromkeys(info[4][0] for info in infos if info[0] == socket.AF_INET))
+    aaaa = tuple(dict.fromkeys(info[4][0] for info in infos if info[0] == socket.AF_INET6))
+    return Resolution(RESOLVED if a or aaaa else NOT_FOUND, a, aaaa)
+
+def _lookup(host, timeout):
+    future = _resolver_executor.submit(_getaddrinfo, host)
+    try:
+        return future.result(timeout=timeout)
+    except FuturesTimeoutError:
+        # A running getaddrinfo cannot be interrupted; its thread is freed when it returns
+        future.cancel()
+        logging.warning(f"DNS lookup for {host} missed its {timeout}s deadline.")
+        return Resolution(FAILED, (), ())
+
+def resolve(host, timeout=LOOKUP_TIMEOUT):
+    """
+    Resolve `host` to its A and AAAA records within `timeout` seconds and
+    return a Resolution. Answers are cached for a time depending on their
+    outcome, and concurrent lookups of the same host share one query.
+    """
+    host = _normalize(host)
+    if not host:
+        return Resolution(NOT_FOUND, (), ())
+    return _dns_cache.get_or_compute(host, lambda: _lookup(host, timeout), ttl=lambda result: _TTLS[result.outcome])
@@ -0,0 +1,120 @@
+import ipaddress
+import os
+from collections import namedtuple
+from functools import lru_cache
+
+PUBLIC_SUFFIX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'public_suffix_list.dat')
+PARSE_CACHE_SIZE = 100000  # Hosts whose parse is kept in memory
+
+_RULE = ''  # Trie key marking the end of a suffix rule
+PRIVATE_SECTION = '// ===BEGIN PRIVATE DOMAINS==='  # Line starting the privately registered suffixes
+_EXCEPTION = '!'  # Trie key marking the end of an exception rule
+
+# subdomains: tuple of labels, domain: the label left of the suffix ('' if
+# none), suffix: public suffix, registrable: domain + suffix (or the host
+# itself for IP addresses and bare suffixes)
+DomainParts = namedtuple('DomainParts', ['host', 'subdomains', 'domain', 'suffix', 'registrable'])
+
+def _punycode(label):
+    try:
+        return label.encode('idna').decode('ascii')
+    except UnicodeError:
+        return None
+
+def load_public_suffixes(path=PUBLIC_SUFFIX_PATH, private=False):
+    """
+    Build the suffix trie from a Public Suffix List file: nested dicts keyed
+    by label from the TLD inwards. Internationalized rules are added in both
+    Unicode and punycode form. The PRIVATE section (suffixes such as
+    github.io under which a company hands out names to its users) is only
+    read if `private`.
+    """
+    trie = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            rule = line.strip()
+            if rule == PRIVATE_SECTION and not private:
+                break
+            if not rule or rule.startswith('//'):
+                continue
+            marker = _RULE
+            if rule.startswith('!'):
+                marker, rule = _EXCEPTION, rule[1:]
+            forms = {rule.lower()}
+            encoded = [_punycode(label) for label in rule.split('.')]
+            if all(encoded):
+                forms.add('.'.join(encoded).lower())
+            for form in forms:
+                node = trie
+                for label in reversed(form.split('.')):
+                    node = node.setdefault(label, {})
+                node[marker] = True
+    return trie
+
+# Preloaded once; the bundled list has no network dependency
+SUFFIX_TRIE = load_public_suffixes()
+PRIVATE_SUFFIX_TRIE = load_public_suffixes(private=True)
+
+def _suffix_length(labels, trie):
+    # Number of trailing labels forming the public suffix, following the
+    # PSL algorithm: exceptions prevail, otherwise the longest rule wins and
+    # an unlisted TLD is a suffix of its own
+    node = trie
+    length = 1
+    for depth, label in enumerate(reversed(labels), 1):
+        child = node.get(label)
+        if child is not None and _EXCEPTION in child:
+            return depth - 1
+        wildcard = node.get('*')
+        if wildcard is not None and _RULE in wildcard:
+            length = depth
+        if child is None:
+            break
+        if _RULE in child:
+            length = depth
+        node = child
+    return min(length, len(labels))
+
+def host_from_netloc(netloc):
+    """Hostname of a URL netloc: without user info, port or IPv6 brackets, lowercased."""
+    host = netloc.rpartition('@')[2]
+    if host.startswith('['):
+        host = host[1:].partition(']')[0]
+    else:
+        host = host.partition(':')[0]
+    return host.rstrip('.').lower()
+
+@lru_cache(maxsize=PARSE_CACHE_SIZE)
+def parse_host(host, private=False):
+    """
+    Split a hostname into DomainParts with one walk of the suffix trie. With
+    `private`, suffixes of the PRIVATE section count as public, so that
+    'a.github.io' and 'b.github.io' are two registrable domains.
+    """
+    host = host.rstrip('.').lower()
+    try:
+        ipaddress.ip_address(host)
+        return DomainParts(host, (), host, '', host)
+    except ValueError:
+        pass
+    labels = host.split('.') if host else []
+    if not labels or not all(labels):
+        # Empty labels (e.g. 'a..b') have no meaningful suffix
+        return DomainParts(host, (), '', '', host)
+    length = _suffix_length(labels, PRIVATE_SUFFIX_TRIE if private else SUFFIX_TRIE)
+    suffix = '.'.join(labels[len(labels) - length:])
+    if length >= len(labels):
+        return DomainParts(host, (), '', suffix, host)
+    domain = labels[-length - 1]
+    return DomainParts(host, tuple(labels[:-length - 1]), domain, suffix, f"{domain}.{suffix}")
+
+def parse_netloc(netloc, private=False):
+    return parse_host(host_from_netloc(netloc), private)
+
+def registrable_domain(netloc, private=False):
+    """
+    Registrable domain of a netloc (e.g. 'x.co.uk' for 'mail.x.co.uk:443').
+    Per-domain caches of what a site's owner controls use `private`, so that
+    tenants of shared suffixes such as github.io do not share entries.
+    """
+    return parse_netloc(netloc, private).registrable
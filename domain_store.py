@@ -0,0 +1,107 @@
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+from cache import TTLCache
+
+MEMORY_SIZE = 50000  # Maximum number of (domain, feature) values mirrored in memory
+PURGE_INTERVAL = 60 * 60  # Seconds between deletions of the expired rows
+
+class DomainFeatureStore:
+    """
+    Persistent cache of per-domain network features backed by an SQLite file.
+
+    Every feature has its own TTL. Rows are read lazily: a lookup that misses
+    the in-memory mirror, a bounded LRU of the recently used values, falls
+    back to the database, so that values written by other worker processes
+    sharing the file are picked up. Expired rows are deleted when the store
+    is opened and then every `purge_interval` seconds. A process forked from
+    the one that opened the store gets its own connection.
+    """
+
+    def __init__(self, path, ttls, negative_ttl=None, memory_size=MEMORY_SIZE, purge_interval=PURGE_INTERVAL):
+        self.path = path
+        self.ttls = ttls  # feature -> seconds
+        self.negative_ttl = negative_ttl
+        self.purge_interval = purge_interval
+        self._memory = TTLCache(maxsize=memory_size, ttl=max(ttls.values(), default=0))  # (domain, feature) -> value
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self.purge_expired()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        # WAL lets several worker processes read while one writes
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('PRAGMA synchronous=NORMAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS domain_features ('
+            'domain TEXT NOT NULL, feature TEXT NOT NULL, value REAL NOT NULL, '
+            'expires_at REAL NOT NULL, PRIMARY KEY (domain, feature))'
+        )
+        conn.commit()
+        return conn
+
+    def _after_fork(self):
+        # An SQLite connection must not be used across fork. The inherited one
+        # is kept open but unused, since closing it could disturb the parent's
+        self._inherited_conn = self._conn
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+
+    def get(self, domain, features):
+        """Return {feature: value} for `domain`, or None unless every feature is cached."""
+        now = time.time()
+        values = {}
+        for feature in features:
+            value = self._memory.get((domain, feature))
+            if value is None:
+                with self._lock:
+                    entry = self._conn.execute(
+                        'SELECT expires_at, value FROM domain_features WHERE domain = ? AND feature = ?',
+                        (domain, feature),
+                    ).fetchone()
+                if entry is None or entry[0] <= now:
+                    return None
+                value = entry[1]
+                self._memory.set((domain, feature), value, ttl=entry[0] - now)
+            values[feature] = _restore_type(value)
+        return values
+
+    def put(self, domain, values, negative=False):
+        """Store feature values for `domain`; negative results use the shorter TTL."""
+        now = time.time()
+        rows = []
+        for feature, value in values.items():
+            ttl = self.negative_ttl if negative else self.ttls.get(feature)
+            if not ttl:
+                continue
+            rows.append((domain, feature, float(value), now + ttl))
+            self._memory.set((domain, feature), float(value), ttl=ttl)
+        if not rows:
+            return
+        with self._lock:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO domain_features (domain, feature, value, expires_at) VALUES (?, ?, ?, ?)',
+                rows,
+            )
+            self._conn.commit()
+        if now - self._purged_at >= self.purge_interval:
+            self.purge_expired()
+
+    def purge_expired(self):
+        """Delete expired rows from the database; the memory mirror drops its own."""
+        with self._lock:
+            self._purged_at = time.time()
+            deleted = self._conn.execute('DELETE FROM domain_features WHERE expires_at <= ?', (self._purged_at,)).rowcount
+            self._conn.commit()
+        if deleted:
+            logging.info(f"Purged {deleted} expired domain features from {self.path}.")
+
+def _restore_type(value):
+    # Values are stored as REAL; integral features come back as int
+    return int(value) if float(value).is_integer() else value
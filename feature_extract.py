@@ -1,18 +1,423 @@
 import re
+import codecs
 import requests
+import http_client
+import dns_resolver
 from urllib.parse import urlparse, urljoin
-import socket
+import sqlite3
 import whois
+from whois.parser import PywhoisError
 from bs4 import BeautifulSoup
+from html.parser import HTMLParser
 import pandas as pd
 import time
 import logging
 import random
 import os
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from functools import cached_property
+import metrics
+from cache import TTLCache
+from circuit_breaker import get_breaker
+from domain_store import DomainFeatureStore
+from keywords import KeywordMatcher, load_keywords
+from domain_parser import parse_netloc, registrable_domain
+
+WHOIS_TTL = 24 * 60 * 60  # Registration dates rarely change, keep records for a day
+WHOIS_NEGATIVE_TTL = 10 * 60  # Retry failed or empty lookups after ten minutes
+WHOIS_CACHE_SIZE = 10000  # Maximum number of domains kept in memory
+
+# Persistent per-domain cache of network features, shared by worker processes
+DOMAIN_CACHE_PATH = 'domain_cache.sqlite3'
+DOMAIN_FEATURE_TTLS = {
+    'google_index': 24 * 60 * 60,
+    'web_traffic': 7 * 24 * 60 * 60,
+    'domain_age': 7 * 24 * 60 * 60,
+    'domain_registration_length': 7 * 24 * 60 * 60,
+    'ip': 60 * 60,
+}
+DOMAIN_CACHE_NEGATIVE_TTL = 5 * 60  # Failed lookups are retried after five minutes
 
-TIME_LIMIT = 3  # Define your time limit in seconds for external requests
+# Headers used for the single fetch of the page being analysed
+# Keyword lists (phishing hints, unsafe domains, brands, ...) from keywords.json,
+# compiled into one automaton so that adding entries does not slow down lookups
+KEYWORDS = load_keywords()
+KEYWORD_MATCHER = KeywordMatcher(KEYWORDS)
 
-def get_google_index(url):
+PAGE_HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.5060.134 Safari/537.36',
+    'Accept-Language': 'en-US,en;q=0.9',
+}
+# How pages are parsed: 'streaming' feeds the body to an incremental tokenizer
+# as it downloads and keeps only what the content features read, 'soup'
+# downloads it whole and builds a BeautifulSoup tree
+PAGE_PARSER = 'streaming'
+PAGE_MAX_BYTES = 1024 * 1024  # Download and parsing stop after this many bytes of a page
+# Matches href attributes of anchor tags in the raw HTML
+HYPERLINK_PATTERN = re.compile(r'<a\s+[^>]*href=["\']([^"\']+)["\']')
+# Endings appended to a chunk of HTML to find whether a match of
+# HYPERLINK_PATTERN starting in it could still grow or complete with the text
+# of the next chunks: between them they complete every unfinished anchor
+HYPERLINK_PROBES = ('a href="x"', ' href="x"')
+# Matches stylesheet hrefs
+CSS_HREF_PATTERN = re.compile(r'\.css$')
+MEDIA_TAGS = ['img', 'video', 'audio']
+# Elements whose content is not part of the page text (as in get_text())
+NON_TEXT_TAGS = frozenset({'script', 'style', 'template'})
+# Elements without content or end tag, closed as soon as they open
+VOID_TAGS = frozenset({
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr',
+})
+BRAND_WORD = 'brand'
+
+class PageSnapshot:
+    """
+    Fetch a page once and parse it once with BeautifulSoup, exposing lazily
+    computed views (anchors, media tags, link tags, title, visible text)
+    shared by all content features. The download stops at `deadline` (a
+    time.monotonic() value), if given.
+    """
+
+    def __init__(self, url, timeout=None, max_bytes=PAGE_MAX_BYTES, deadline=None):
+        self.url = url
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.deadline = deadline
+        self.error = None
+
+    @cached_property
+    def response(self):
+        try:
+            return http_client.get(
+                self.url, headers=PAGE_HEADERS, timeout=self.timeout, max_bytes=self.max_bytes, provider='page',
+                deadline=self.deadline,
+            )
+        except Exception as e:
+            self.error = e
+            return None
+
+    def fetch(self):
+        self.html
+
+    def parse(self):
+        self.soup
+
+    @property
+    def fetched(self):
+        # A response was received, whatever its status code
+        return self.response is not None
+
+    @property
+    def ok(self):
+        # A response was received and it was not a 4xx/5xx
+        return self.fetched and self.response.ok
+
+    @cached_property
+    def html(self):
+        return self.response.text if self.fetched else ''
+
+    @cached_property
+    def soup(self):
+        return BeautifulSoup(self.html, 'html.parser')
+
+    @cached_property
+    def anchors(self):
+        # Attribute dicts of every <a> tag
+        return [tag.attrs for tag in self.soup.find_all('a')]
+
+    @cached_property
+    def media(self):
+        # Attribute dicts of every <img>, <video> and <audio> tag
+        return [tag.attrs for tag in self.soup.find_all(MEDIA_TAGS)]
+
+    @cached_property
+    def links(self):
+        # Attribute dicts of every <link> tag
+        return [tag.attrs for tag in self.soup.find_all('link')]
+
+    @cached_property
+    def title(self):
+        title = self.soup.title.string if self.soup.title else ''
+        return title if title is not None else ''
+
+    @cached_property
+    def text(self):
+        return self.soup.get_text()
+
+    @cached_property
+    def hyperlink_count(self):
+        return len(HYPERLINK_PATTERN.findall(self.html))
+
+    @cached_property
+    def word_count(self):
+        # Whitespace-separated words of the raw HTML
+        return len(self.html.split())
+
+    @cached_property
+    def has_copyright(self):
+        return '©' in self.text
+
+    @cached_property
+    def mentions_brand(self):
+        return BRAND_WORD in self.text.lower()
+
+def _kept_attribute(attrs, name):
+    # The one attribute the features read, as an attribute dict like the tree's
+    for key, value in reversed(attrs):
+        if key == name:
+            return {name: value if value is not None else ''}
+    return {}
+
+class _PageParser(HTMLParser):
+    """Collects, in one pass over the HTML, the values PageSnapshot derives from its tree."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.anchors = []
+        self.media = []
+        self.links = []
+        self.title = ''
+        self.hyperlink_count = 0
+        self.word_count = 0
+        self.has_copyright = False
+        self.mentions_brand = False
+        self._open = []  # Names of the open elements, nested as in soup's tree
+        self._title_open = []  # (tag, children) of the first <title> and the elements open in it
+        self._title_seen = False
+        self._title_text = False  # The last child in the title is text that more data extends
+        self._skipped = 0  # Open NON_TEXT_TAGS elements
+        self._in_word = False  # The text so far ends inside a word
+        self._tail = ''  # End of the page text, for a brand word split across strings
+        self._link_tail = ''  # Raw HTML from where a hyperlink match may continue in the next chunk
+
+    def feed_text(self, text):
+        if not text:
+            return
+        # A word split across two chunks is counted once
+        words = len(text.split())
+        if self._in_word and not text[0].isspace():
+            words -= 1
+        self.word_count += words
+        self._in_word = not text[-1].isspace()
+        self._count_hyperlinks(text)
+        self.feed(text)
+
+    def _count_hyperlinks(self, text):
+        # HYPERLINK_PATTERN runs over the raw HTML, script and comments
+        # included, like on the whole page. Matches that more text could
+        # still change, and the rest of the chunk from the first place an
+        # anchor may continue, are carried over to the next chunk
+        html = self._link_tail + text
+        probed = [html + probe for probe in HYPERLINK_PROBES]
+
+        def pending(start, end=None):
+            for candidate in probed:
+                match = HYPERLINK_PATTERN.match(candidate, start)
+                if match and match.end() != end:
+                    return True
+            return False
+
+        position = 0
+        for match in HYPERLINK_PATTERN.finditer(html):
+            if pending(match.start(), match.end()):
+                self._link_tail = html[match.start():]
+                return
+            self.hyperlink_count += 1
+            position = match.end()
+        start = html.find('<', position)
+        while start >= 0 and not pending(start):
+            start = html.find('<', start + 1)
+        self._link_tail = html[start:] if start >= 0 else ''
+
+    def finish(self):
+        self.close()
+        # The page ended: what was carried over matches as it stands
+        self.hyperlink_count += len(HYPERLINK_PATTERN.findall(self._link_tail))
+        self._link_tail = ''
+        if self._title_open:
+            # The page was cut inside its title
+            self.title = _string_of(self._title_open[0][1])
+            self._title_open = []
+
+    def handle_starttag(self, tag, attrs):
+        self._title_text = False
+        if self._title_open:
+            # Elements inside the title, kept to find its string like soup
+            element = []
+            self._title_open[-1][1].append(element)
+            if tag not in VOID_TAGS:
+                self._title_open.append((tag, element))
+        if tag == 'a':
+            self.anchors.append(_kept_attribute(attrs, 'href'))
+        elif tag in MEDIA_TAGS:
+            self.media.append(_kept_attribute(attrs, 'src'))
+        elif tag == 'link':
+            self.links.append(_kept_attribute(attrs, 'href'))
+        elif tag == 'title' and not self._title_seen:
+            self._title_seen = True
+            self._title_open = [(tag, [])]
+        if tag not in VOID_TAGS:
+            self._open.append(tag)
+            self._skipped += tag in NON_TEXT_TAGS
+
+    def handle_endtag(self, tag):
+        # Any tag ends the current string. An end tag closes the latest open
+        # element of its name and the ones opened after it, and is ignored
+        # when none is open
+        self._title_text = False
+        for index in range(len(self._open) - 1, -1, -1):
+            if self._open[index] == tag:
+                break
+        else:
+            return
+        closed = self._open[index:]
+        del self._open[index:]
+        self._skipped -= sum(name in NON_TEXT_TAGS for name in closed)
+        # The open title elements are the last ones of self._open
+        if len(closed) >= len(self._title_open) > 0:
+            self.title = _string_of(self._title_open[0][1])
+            self._title_open = []
+        elif self._title_open:
+            del self._title_open[-len(closed):]
+
+    def handle_comment(self, data):
+        self._title_text = False
+        if self._title_open:
+            self._title_open[-1][1].append(data)
+
+    def handle_data(self, data):
+        if self._title_open:
+            children = self._title_open[-1][1]
+            # Text split across chunks is one string
+            if self._title_text:
+                children[-1] += data
+            else:
+                children.append(data)
+                self._title_text = True
+        if self._skipped:
+            return
+        if not self.has_copyright and '©' in data:
+            self.has_copyright = True
+        if not self.mentions_brand:
+            text = self._tail + data.lower()
+            self.mentions_brand = BRAND_WORD in text
+            self._tail = text[-(len(BRAND_WORD) - 1):]
+
+def _string_of(children):
+    # Like soup's .string: the text of an element whose only child is a
+    # string, or an element with a string of its own, '' otherwise
+    if len(children) != 1:
+        return ''
+    child = children[0]
+    return child if isinstance(child, str) else _string_of(child)
+
+def _decoder_for(encoding):
+    # Incremental version of the decoding done by response.text; pages
+    # without a declared charset are read as UTF-8
+    try:
+        return codecs.getincrementaldecoder(encoding or 'utf-8')(errors='replace')
+    except LookupError:
+        return codecs.getincrementaldecoder('utf-8')(errors='replace')
+
+class StreamingPageSnapshot:
+    """
+    Fetch a page and parse it while it downloads, keeping neither the body
+    nor a tree: an incremental tokenizer collects the hrefs of anchors and
+    links, the srcs of media, the title, the number of raw words and whether
+    the page text contains '©' or 'brand'. Reading stops after `max_bytes`,
+    so memory per page is bounded whatever its size, and at `deadline` (a
+    time.monotonic() value), so a slow server does not hold the thread.
+    Same views as PageSnapshot, except `html`, `soup` and `text`.
+    """
+
+    def __init__(self, url, timeout=None, max_bytes=PAGE_MAX_BYTES, deadline=None):
+        self.url = url
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.deadline = deadline
+        self.error = None
+        self.status_ok = False
+        self.truncated = False
+
+    @cached_property
+    def parser(self):
+        parser = _PageParser()
+        try:
+            with http_client.stream(
+                self.url, headers=PAGE_HEADERS, timeout=self.timeout, provider='page', deadline=self.deadline
+            ) as response:
+                self.status_ok = response.ok
+                decoder = _decoder_for(response.encoding)
+                for chunk in http_client.iter_body(response, self.max_bytes, self.deadline):
+                    parser.feed_text(decoder.decode(chunk))
+                parser.feed_text(decoder.decode(b'', final=True))
+                self.truncated = response.truncated
+        except Exception as e:
+            # Like a failed download, a body that breaks off leaves no page
+            self.error = e
+            return None
+        parser.finish()
+        return parser
+
+    def fetch(self):
+        self.parser
+
+    def parse(self):
+        # Parsed while downloading, so the parse is timed with the fetch
+        pass
+
+    @property
+    def fetched(self):
+        return self.parser is not None
+
+    @property
+    def ok(self):
+        return self.fetched and self.status_ok
+
+    @property
+    def anchors(self):
+        return self.parser.anchors
+
+    @property
+    def media(self):
+        return self.parser.media
+
+    @property
+    def links(self):
+        return self.parser.links
+
+    @property
+    def title(self):
+        return self.parser.title
+
+    @property
+    def hyperlink_count(self):
+        return self.parser.hyperlink_count
+
+    @property
+    def word_count(self):
+        return self.parser.word_count
+
+    @property
+    def has_copyright(self):
+        return self.parser.has_copyright
+
+    @property
+    def mentions_brand(self):
+        return self.parser.mentions_brand
+
+PAGE_SNAPSHOTS = {'soup': PageSnapshot, 'streaming': StreamingPageSnapshot}
+
+def new_page_snapshot(url, timeout=None, deadline=None):
+    """Unfetched snapshot of `url`, parsed the PAGE_PARSER way."""
+    return PAGE_SNAPSHOTS[PAGE_PARSER](url, timeout, deadline=deadline)
+
+def _page_for(url, page):
+    # Reuse the caller's snapshot, or fetch one for standalone calls
+    return page if page is not None else new_page_snapshot(url)
+
+def get_google_index(url, deadline=None):
     parsed_url = urlparse(url)
     USER_AGENTS = [
     "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/92.0.4515.107 Safari/537.36",
@@ -26,7 +431,10 @@ def get_google_index(url):
     try:
         # Use a random user-agent for the request
         headers = {'User-Agent': random.choice(USER_AGENTS)}
-        response = requests.get(f"https://www.google.com/search?q=site:{parsed_url.netloc}", headers=headers, timeout=TIME_LIMIT)
+        response = http_client.get(
+            f"https://www.google.com/search?q=site:{parsed_url.netloc}", headers=headers, provider='google',
+            deadline=deadline,
+        )
         # Check for success
         if response.status_code == 200:
             # Check if the page contains the URL (this might be a rough indicator of indexing)
@@ -37,13 +445,16 @@ def get_google_index(url):
         else:
             # Handle other HTTP errors gracefully
             return -1
+    except http_client.HostBusyError as e:
+        logging.warning(f"Google index lookup skipped for {url}, using the fallback value: {str(e)}")
+        return -1
     except requests.exceptions.RequestException as e:
         return -1
 
-def get_web_traffic(url):
+def get_web_traffic(url, deadline=None):
     try:
         # Replace with the actual SimilarWeb page for the desired website
-        response = requests.get(f'https://www.similarweb.com/website/{url}/')
+        response = http_client.get(f'https://www.similarweb.com/website/{url}/', provider='similarweb', deadline=deadline)
         response.raise_for_status()  # Check for request errors
         # Parse the HTML content
         soup = BeautifulSoup(response.text, 'html.parser')
@@ -55,145 +466,148 @@ def get_web_traffic(url):
             return int(traffic.replace(',', ''))  # Convert to integer
         else:
             return 0  # Default to 0 if no data is found
+    except http_client.HostBusyError as e:
+        logging.warning(f"Web traffic lookup skipped for {url}, using the fallback value: {str(e)}")
+        return 0
     except Exception as e:
         return 0  # Default to 0 if an exception occurs
 
-def get_domain_age(url):
+# WHOIS lookup outcomes
+WHOIS_OK = 'ok'  # Record with creation and expiration dates
+WHOIS_EMPTY = 'empty'  # Record without usable dates
+WHOIS_ERROR = 'error'  # Lookup failed
+
+_whois_cache = TTLCache(maxsize=WHOIS_CACHE_SIZE, ttl=WHOIS_TTL, name='whois')
+
+def _query_whois(domain):
     try:
-        domain = urlparse(url).netloc
-        # Handle localhost specifically
-        if domain == "localhost":
-            return 0  # Or return 0 depending on your requirements
-        domain_info = whois.whois(domain)
+        # A domain without a record is an answer, not a failure of the server
+        with get_breaker('whois').guard(answered=(PywhoisError,)):
+            domain_info = whois.whois(domain)
         # Check for valid creation and expiration dates
         if domain_info.creation_date and domain_info.expiration_date:
             creation_date = domain_info.creation_date if not isinstance(domain_info.creation_date, list) else domain_info.creation_date[0]
             expiration_date = domain_info.expiration_date if not isinstance(domain_info.expiration_date, list) else domain_info.expiration_date[0]
-            return (expiration_date - creation_date).days
-        return 365  # Unable to determine age, return None
+            return WHOIS_OK, (expiration_date - creation_date).days
+        return WHOIS_EMPTY, None
     except Exception as e:
-        return -1  # Return None if an error occurs
+        return WHOIS_ERROR, None
+
+def lookup_whois(url):
+    """
+    Return (outcome, days between creation and expiration) for the domain of
+    `url`. Results are cached per registered domain; empty records and
+    errors are cached for a shorter time.
+    """
+    # www.x.co.uk and mail.x.co.uk share the record of x.co.uk
+    domain = registrable_domain(urlparse(url).netloc)
+    return _whois_cache.get_or_compute(
+        domain,
+        lambda: _query_whois(domain),
+        ttl=lambda result: WHOIS_TTL if result[0] == WHOIS_OK else WHOIS_NEGATIVE_TTL,
+    )
+
+def get_domain_age(url, whois_result=None):
+    # Handle localhost specifically
+    if urlparse(url).netloc == "localhost":
+        return 0  # Or return 0 depending on your requirements
+    outcome, days = whois_result or lookup_whois(url)
+    if outcome == WHOIS_OK:
+        return days
+    if outcome == WHOIS_EMPTY:
+        return 365  # Unable to determine age
+    return -1  # Error during the lookup
+
+# Words of the raw URL, and terms left out of length_words_raw
+WORD_PATTERN = re.compile(r'\w+')
+LENGTH_WORDS_EXCLUDED = frozenset({"http", "https", "ftp", "www", "com", "co", "uk", "org", "net", "gov", "edu", "info", "localhost"})
 
 def extract_longest_words_raw(url):
     # Find all words consisting only of alphabetic characters
-    words = re.findall(r'\w+', url)
+    words = WORD_PATTERN.findall(url)
     # Return length of the longest word or 0 if no valid words found
     return len(max(words, key=len)) if words else 0
-    return 0  # Return 0 if no words found
 
 def extract_length_words_raw(url):
-    # Define a set of terms to exclude
-    exclude_terms = {"http", "https", "ftp", "www", "com", "co", "uk", "org", "net", "gov", "edu", "info", "localhost"}
     # Find all words
-    words = re.findall(r'\w+', url)
+    words = WORD_PATTERN.findall(url)
     # Filter out excluded terms and sum the lengths of valid words
-    valid_words = [word for word in words if word.lower() not in exclude_terms]
+    valid_words = [word for word in words if word.lower() not in LENGTH_WORDS_EXCLUDED]
     return sum(len(word) for word in valid_words)
 
 
-def extract_links_in_tags(url, timeout=10):
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/58.0.3029.110 Safari/537.3'
-        }
-        response = requests.get(url, headers=headers, timeout=timeout)
-        response.raise_for_status()  # Raise an error for bad responses
-        soup = BeautifulSoup(response.text, 'html.parser')
-        links = soup.find_all('a')
-        return len(links)
-    except requests.ConnectionError:
-        return -1
-    except requests.Timeout:
-        return -1
-    except requests.RequestException as e:
+def extract_links_in_tags(url, page=None):
+    page = _page_for(url, page)
+    if not page.ok:
         return -1
+    return len(page.anchors)
 
-def extract_domain_registration_length(url):
-    try:
-        domain_info = whois.whois(urlparse(url).netloc)
-        if domain_info.creation_date and domain_info.expiration_date:
-            creation_date = domain_info.creation_date if not isinstance(domain_info.creation_date, list) else domain_info.creation_date[0]
-            expiration_date = domain_info.expiration_date if not isinstance(domain_info.expiration_date, list) else domain_info.expiration_date[0]
-            return (expiration_date - creation_date).days
+def extract_domain_registration_length(url, whois_result=None):
+    outcome, days = whois_result or lookup_whois(url)
+    if outcome == WHOIS_OK:
+        return days
+    if outcome == WHOIS_EMPTY:
         return 365  # Default median registration length in days
-    except whois.parser.PywhoisError as e:
-        return 0  # Return None or 0 to indicate failure
-    except Exception as e:
-        return 0  # Return None or 0 to indicate failure
+    return 0  # 0 indicates failure
 
-def extract_ratio_intMedia(url):
-    try:
-        # Fetch HTML content with a custom User-Agent
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=TIME_LIMIT)
-        response.raise_for_status()  # Raise exception for bad status
-        # Parse HTML with BeautifulSoup
-        soup = BeautifulSoup(response.text, 'html.parser')
-        # Find all media tags
-        all_media = soup.find_all(['img', 'video', 'audio'])
-        # Calculate the base domain for comparison
-        base_domain = urlparse(url).netloc
-        # Filter internal media by checking domain of 'src' attribute, handling relative URLs
-        internal_media = [
-            tag for tag in all_media
-            if urlparse(urljoin(url, tag.get('src', ''))).netloc == base_domain
-        ]
-        # Return ratio of internal media to total media
-        return len(internal_media) / len(all_media) if all_media else 0
-    except requests.RequestException:
+def extract_ratio_intMedia(url, page=None):
+    page = _page_for(url, page)
+    if not page.ok:
         return -1  # Return -1 for any error
+    all_media = page.media
+    # Calculate the base domain for comparison
+    base_domain = urlparse(url).netloc
+    # Filter internal media by checking domain of 'src' attribute, handling relative URLs
+    internal_media = [
+        tag for tag in all_media
+        if urlparse(urljoin(url, tag.get('src', ''))).netloc == base_domain
+    ]
+    # Return ratio of internal media to total media
+    return len(internal_media) / len(all_media) if all_media else 0
 
-def extract_ratio_extMedia(url):
-    try:
-        # Fetch HTML content with a custom User-Agent
-        headers = {'User-Agent': 'Mozilla/5.0'}
-        response = requests.get(url, headers=headers, timeout=TIME_LIMIT)
-        response.raise_for_status()  # Raise exception for bad status
-        # Parse HTML with BeautifulSoup
-        soup = BeautifulSoup(response.text, 'html.parser')
-        # Find all media tags
-        all_media = soup.find_all(['img', 'video', 'audio'])
-        # Calculate the base domain for comparison
-        base_domain = urlparse(url).netloc
-        # Filter external media by checking domain of 'src' attribute, handling relative URLs
-        external_media = [
-            tag for tag in all_media
-            if tag.get('src') and urlparse(urljoin(url, tag.get('src', ''))).netloc != base_domain
-        ]
-        # Return ratio of external media to total media
-        return len(external_media) / len(all_media) if all_media else 0
-    except requests.RequestException:
+def extract_ratio_extMedia(url, page=None):
+    page = _page_for(url, page)
+    if not page.ok:
         return -1  # Return -1 for any error
+    all_media = page.media
+    # Calculate the base domain for comparison
+    base_domain = urlparse(url).netloc
+    # Filter external media by checking domain of 'src' attribute, handling relative URLs
+    external_media = [
+        tag for tag in all_media
+        if tag.get('src') and urlparse(urljoin(url, tag.get('src', ''))).netloc != base_domain
+    ]
+    # Return ratio of external media to total media
+    return len(external_media) / len(all_media) if all_media else 0
+
+# Regular expression to match IPv4 addresses
+IPV4_PATTERN = re.compile(r"^\d{1,3}(\.\d{1,3}){3}$")
 
 def extract_ip_feature(url):
-    features = {}
     parsed_url = urlparse(url)
     hostname = parsed_url.netloc
-    # Regular expression to match IPv4 addresses
-    ip_pattern = re.compile(r"^\d{1,3}(\.\d{1,3}){3}$")
     # Check if the hostname is an IP address
-    if ip_pattern.match(hostname):
+    if IPV4_PATTERN.match(hostname):
         return 1  # URL contains IP address
-    else:
-        try:
-            # Resolve the hostname to an IP address
-            socket.gethostbyname(hostname)
-            return 0  # URL does not contain IP address
-        except socket.gaierror:
-            return -1  # Invalid domain or cannot resolve
-
-def extract_hyperlink_count(url):
-    try:
-        response = requests.get(url, timeout=TIME_LIMIT)
-        # Improved regex to match href attributes in different contexts
-        hyperlinks = re.findall(r'<a\s+[^>]*href=["\']([^"\']+)["\']', response.text)
-        return len(hyperlinks)
-    except Exception as e:
+    # Resolve the hostname to an IPv4 address, as gethostbyname did for the
+    # training data; lookups that fail or time out count as unresolvable
+    if dns_resolver.resolve(hostname).a:
+        return 0  # URL does not contain IP address
+    return -1  # Invalid domain or cannot resolve
+
+def extract_hyperlink_count(url, page=None):
+    page = _page_for(url, page)
+    if not page.fetched:
         return -1  # Return -1 if there's an error
+    # Anchors whose href matches HYPERLINK_PATTERN in the raw HTML
+    return page.hyperlink_count
+
+SPECIAL_CHARACTERS = '@!$%^&*(),?":{}|<>'
+SPECIAL_CHARACTERS_PATTERN = re.compile(r'[@!$%^&*(),?":{}|<>]')
 
 def count_special_characters(url):
     try:
-        special_chars = re.findall(r'[@!$%^&*(),?":{}|<>]', url)
+        special_chars = SPECIAL_CHARACTERS_PATTERN.findall(url)
         return len(special_chars)
     except Exception:
         return -1
@@ -236,9 +650,8 @@ def count_parameters(url):
     except Exception:
         return -1
 
-def uncommon_tld(url):
-    # Basic set of the most common TLDs
-    common_tlds = [
+# Basic set of the most common TLDs
+COMMON_TLDS = frozenset({
     '.com',    # Most common for commercial businesses
     '.org',    # Commonly used by non-profit organizations
     '.net',    # Often used by internet service providers and tech companies
@@ -257,7 +670,9 @@ def uncommon_tld(url):
     '.name',   # Personal branding sites
     '.pro',    # Professional services
     '.jobs',   # Employment and job postings
-    ]
+})
+
+def uncommon_tld(url):
     try:
         # Parse the TLD from the URL
         domain_parts = urlparse(url).netloc.split('.')
@@ -266,7 +681,7 @@ def uncommon_tld(url):
         # Extract the TLD
         tld = '.' + domain_parts[-1].lower()  # Convert to lowercase to handle cases like .COM
         # Mark as 0 for common TLDs, 1 for uncommon
-        return 0 if tld in common_tlds else 1
+        return 0 if tld in COMMON_TLDS else 1
     except Exception:
         return -1  # Return -1 if an exception occurs
 
@@ -284,18 +699,78 @@ def is_numeric_domain(url):
     except Exception:
         return -1  # Return -1 in case of an error
 
-def domain_misspelling(url, common_words=["google", "facebook", "fb", "amazon", "instagram", "insta", "twitter", "youtube", "yt", "shopify", "paypal", "linkedin", "microsoft", "apple"]):
+BRAND_NAMES = tuple(KEYWORDS['brands'])
+# Likely phishing additions such as "my", "login", "secure", etc.
+MISSPELLING_PREFIXES = tuple(KEYWORDS['misspelling_prefixes'])
+
+def _brand_pattern(common_words):
+    # Regular expression to identify typical phishing patterns around brand names
+    return re.compile(r'\b(?:{})\b'.format('|'.join(common_words)), re.IGNORECASE)
+
+BRAND_PATTERN = _brand_pattern(BRAND_NAMES)
+
+def _word_boundary(text, index):
+    # Same rule as the regex \b: a word character on exactly one side
+    before = index > 0 and (text[index - 1].isalnum() or text[index - 1] == '_')
+    after = index < len(text) and (text[index].isalnum() or text[index] == '_')
+    return before != after
+
+def scan_host_keywords(netloc):
+    """
+    Find every keyword in the host in one pass of KEYWORD_MATCHER and return
+    (unsafe, abnormal_tld, misspelling): whether it contains an unsafe domain,
+    whether it ends with an abnormal TLD, and the domain_misspelling value of
+    its first label. Matches are case-sensitive except the word-bounded brand
+    check, as in the per-list checks they replace.
+    """
+    first_length = netloc.find('.')
+    if first_length == -1:
+        first_length = len(netloc)
+    first_label = netloc[:first_length]
+    # Lowercasing ASCII keeps every position, so a single scan serves both cases
+    ascii_host = netloc.isascii()
+    text = netloc.lower() if ascii_host else netloc
+    unsafe = abnormal_tld = bounded_brand = has_prefix = False
+    brands = set()
+    for start, word, categories in KEYWORD_MATCHER.find_all(text):
+        end = start + len(word)
+        in_first_label = end <= first_length
+        if ascii_host and in_first_label and 'brands' in categories:
+            first_text = text[:first_length]
+            if _word_boundary(first_text, start) and _word_boundary(first_text, end):
+                bounded_brand = True
+        if netloc[start:end] != word:
+            continue  # Only matches ignoring case
+        if 'unsafe_domains' in categories:
+            unsafe = True
+        if 'abnormal_tlds' in categories and end == len(netloc):
+            abnormal_tld = True
+        if in_first_label and 'brands' in categories:
+            brands.add(word)
+        if in_first_label and 'misspelling_prefixes' in categories:
+            has_prefix = True
+    if not ascii_host:
+        bounded_brand = BRAND_PATTERN.search(first_label) is not None
+    if not bounded_brand:
+        misspelling = 1  # Suspicious if unrelated to any known brand
+    else:
+        # Contains a brand without being exactly that brand, plus a phishing addition
+        misspelling = 1 if has_prefix and any(word != first_label for word in brands) else 0
+    return unsafe, abnormal_tld, misspelling
+
+def domain_misspelling(url, common_words=BRAND_NAMES):
     try:
+        if common_words is BRAND_NAMES:
+            return scan_host_keywords(urlparse(url).netloc)[2]
         domain = urlparse(url).netloc.split('.')[0]
-        # Regular expression to identify typical phishing patterns around brand names
-        pattern = re.compile(r'\b(?:{})\b'.format('|'.join(common_words)), re.IGNORECASE)
+        pattern = _brand_pattern(common_words)
         # Check if a brand name exists within the domain but isn't an exact match
         if pattern.search(domain):
             for word in common_words:
                 # Match if domain contains the brand but is not exactly the brand
                 if word in domain and domain != word:
-                    # Check for likely phishing additions such as "my", "login", "secure", etc.
-                    if any(prefix in domain for prefix in ["my", "login", "secure", "service", "page", "account", "help", "buy", "shop", "friends", "support", "team"]):
+                    # Check for likely phishing additions
+                    if any(prefix in domain for prefix in MISSPELLING_PREFIXES):
                         return 1
                     # Allow exact brand domains
                     elif domain == word:
@@ -313,60 +788,34 @@ def qty_double_slash_path(url):
     except Exception:
         return -1
 
+# List of common phishing hints
+PHISHING_INDICATORS = tuple(KEYWORDS['phishing_hints'])
+
 def extract_phishing_hints(url):
     # Initialize hints counter
     hints = 0
     # Convert URL to lowercase for consistent checks
     url_lower = url.lower()
-    # List of common phishing hints
-    phishing_indicators = [
-        'login',       # Login page
-        'secure',      # Secure pages often misused
-        'verify',      # Verification processes
-        'account',     # References to accounts
-        'update',      # Requests for updates
-        'confirm',     # Confirmation pages
-        'alert',       # Alerts or warnings
-        'suspend',     # Account suspension warnings
-        'password',    # Password input requests
-        'credentials',  # Credential requests
-        'bank',        # Financial institutions
-        'free',        # Often used in scams
-        'offers',      # Special offers or deals
-        'click',       # Clickbait
-        'urgent',      # Urgent messages
-        'porn',
-        'x',
-        'torrent'
-    ]
-    # Check for phishing indicators in the URL
-    for indicator in phishing_indicators:
-        if indicator in url_lower:
-            hints += 1
+    # Count the distinct phishing indicators in the URL
+    hints += len(KEYWORD_MATCHER.keywords_in(url_lower, 'phishing_hints'))
     # Return the total count of phishing hints
     return hints
 
-def calculate_ratio_extHyperlinks(url):
+def calculate_ratio_extHyperlinks(url, page=None):
     # Parse base domain of the URL
     base_domain = urlparse(url).netloc.lower()
-    try:
-        # Fetch HTML content of the URL
-        response = requests.get(url, timeout=10)
-        response.raise_for_status()  # Raise an error if the request failed
-        html_content = response.text
-        # Parse HTML with BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
-        # Find all anchor tags in the HTML
-        all_links = soup.find_all('a', href=True)
-        # Count external links by checking each anchor tag's href attribute
-        ext_links = sum(1 for link in all_links if base_domain not in link['href'] and link['href'].startswith('http'))
-        # Total links for ratio calculation
-        total_links = len(all_links) or 1  # Avoid division by zero
-        # Calculate ratio of external links to total links
-        ratio_extHyperlinks = ext_links / total_links
-        return ratio_extHyperlinks
-    except requests.RequestException as e:
+    page = _page_for(url, page)
+    if not page.ok:
         return -1
+    # Anchor tags that carry an href attribute
+    all_links = [link for link in page.anchors if 'href' in link]
+    # Count external links by checking each anchor tag's href attribute
+    ext_links = sum(1 for link in all_links if base_domain not in link['href'] and link['href'].startswith('http'))
+    # Total links for ratio calculation
+    total_links = len(all_links) or 1  # Avoid division by zero
+    # Calculate ratio of external links to total links
+    ratio_extHyperlinks = ext_links / total_links
+    return ratio_extHyperlinks
 
 def calculate_ratio_digits_url(url):
     # Check for empty URL to prevent division by zero
@@ -387,6 +836,12 @@ def extract_length_hostname(url):
     parsed_url = urlparse(url)
     return len(parsed_url.hostname) if parsed_url.hostname else 0
 
+# List of known unsafe or suspicious domains
+UNSAFE_DOMAINS = tuple(KEYWORDS['unsafe_domains'])
+# Common domain extensions considered safe
+COMMON_SAFE_EXTENSIONS = frozenset({'com', 'org', 'net', 'gov', 'edu', 'info'})
+MAX_SAFE_URL_LENGTH = 2048  # Common maximum URL length
+
 def extract_safe_anchor(url):
     # Initialize the safe anchor score
     safe_anchor_score = 1  # Assume it's safe initially
@@ -394,125 +849,39 @@ def extract_safe_anchor(url):
     is_https = url.lower().startswith('https://')
     if not is_https:
         safe_anchor_score = 0  # Not secure if it doesn't start with https
-    # List of known unsafe or suspicious domains
-    unsafe_domains = [
-    'example.com',        # Placeholder example
-    'test.com',           # Placeholder example
-    'phishingsite.com',   # Generic phishing site
-    'malicious.com',      # Generic malicious site
-    'suspicious.com',     # Generic suspicious site
-    'fakebank.com',       # Known phishing site
-    'secure-login.com',   # Common phishing keyword
-    'login-page.com',     # Common phishing keyword
-    'verify-account.com',  # Common phishing keyword
-    'bank-update.com',    # Common phishing keyword
-    'update-your-account.com',  # Common phishing keyword
-    'account-login.com',  # Common phishing keyword
-    'login-confirm.com',  # Common phishing keyword
-    'payment-verification.com',  # Common phishing keyword
-    'confirm-your-account.com',  # Common phishing keyword
-    'secure-accounts.com', # Common phishing keyword
-    'account-recovery.com', # Common phishing keyword
-    'get-your-password.com', # Common phishing keyword
-    'login-secure.com',    # Common phishing keyword
-    'account-access.com',  # Common phishing keyword
-    'phishingsite.net',    # Variants of phishing sites
-    'malicious.net',       # Variants of malicious sites
-    'suspicious.net',      # Variants of suspicious sites
-    'unknown-website.com', # Hypothetical domain
-    'untrusted-site.com',  # Hypothetical domain
-    'fraudulent-activity.com', # Hypothetical domain
-    'scam-website.com',    # Hypothetical domain
-    'dangerous-link.com',  # Hypothetical domain
-    'fraud.com',           # Generic fraud site
-    'impersonate.com',     # Generic impersonation site
-    'malware-distribution.com', # Sites known for malware
-    'phishing-attack.com', # Generic phishing site
-    'hacked-login.com',    # Impersonating login pages
-    'spoofed-site.com',    # Generic spoofed site
-    'secure-your-identity.com', # Common phishing keyword
-    'identity-theft.com',  # Generic identity theft site
-    'login-verification.com', # Common phishing keyword
-    'verify-your-identity.com', # Common phishing keyword
-    # Add more domains as needed
-]
     # Check if the domain of the URL is in the unsafe domains list
     domain = urlparse(url).netloc
-    is_safe_domain = not any(unsafe in domain for unsafe in unsafe_domains)
+    is_safe_domain = not scan_host_keywords(domain)[0]
     if not is_safe_domain:
         safe_anchor_score = 0  # Not safe if the domain is unsafe
     # Check for common domain extensions
-    common_safe_extensions = ['com', 'org', 'net', 'gov', 'edu', 'info']
     domain_extension = domain.split('.')[-1] if '.' in domain else ''
-    is_common_extension = domain_extension in common_safe_extensions
+    is_common_extension = domain_extension in COMMON_SAFE_EXTENSIONS
     if not is_common_extension:
         safe_anchor_score = 0  # Not safe if the domain extension is uncommon
     # Check for excessive length of URL
-    max_length = 2048  # Common maximum URL length
-    is_length_safe = len(url) <= max_length
+    is_length_safe = len(url) <= MAX_SAFE_URL_LENGTH
     if not is_length_safe:
         safe_anchor_score = 0  # Not safe if the URL is too long
     return safe_anchor_score
 
-def check_domain_in_title(url):
-    # Create headers to simulate a Chrome browser
-    headers = {
-        'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/103.0.5060.134 Safari/537.36',
-        'Accept-Language': 'en-US,en;q=0.9',
-        'Accept-Encoding': 'gzip, deflate, br',
-        'Connection': 'keep-alive'
-    }
+def check_domain_in_title(url, page=None):
     parsed_url = urlparse(url)
-    try:
-        response = requests.get(url, headers=headers, timeout=TIME_LIMIT)
-        response.raise_for_status()  # Raises an error for bad responses
-        # Extract title from the HTML using BeautifulSoup
-        soup = BeautifulSoup(response.text, 'html.parser')
-        title = soup.title.string if soup.title else ''  # Ensure title is a string
-        # Check if title is None and handle it
-        if title is None:
-            title = ''  # Default to empty string if title is None
-        # Get domain parts and convert them to lowercase
-        domain_parts = parsed_url.netloc.split('.')
-        domain_words = [part.lower() for part in domain_parts]
-        # Check if any domain word is in the title (case-insensitive)
-        domain_in_title = any(word in title.lower() for word in domain_words)
-        # Return 1 if any word from domain is found in title, else return 0
-        result = 1 if domain_in_title else 0
-        return result  # Return the result
-    except requests.Timeout:
+    page = _page_for(url, page)
+    if not page.ok:
         return -1  # Indicate error with -1
-    except requests.HTTPError as http_err:
-        return -1  # Handle HTTP errors
-    except requests.RequestException as e:
-        return -1  # Handle other requests exceptions
+    title = page.title
+    # Get domain parts and convert them to lowercase
+    domain_parts = parsed_url.netloc.split('.')
+    domain_words = [part.lower() for part in domain_parts]
+    # Check if any domain word is in the title (case-insensitive)
+    domain_in_title = any(word in title.lower() for word in domain_words)
+    # Return 1 if any word from domain is found in title, else return 0
+    return 1 if domain_in_title else 0
 
 def extract_nb_subdomains(url):
-    # Parse the URL
-    parsed_url = urlparse(url)
-    netloc = parsed_url.netloc
-    two_part_tlds = {
-    "co.uk", "com.au", "net.au", "org.au", "gov.uk", "ac.uk",
-    "gov.au", "com.sg", "co.jp", "co.in", "co.kr", "com.cn"
-}
-    # Remove port number if present
-    if ':' in netloc:
-        netloc = netloc.split(':')[0]
-    # Split the network location by dots
-    parts = netloc.split('.')
-    # Ensure there are at least two parts (domain and TLD)
-    if len(parts) < 2:
-        return 0  # No valid domain structure found
-    # Form the TLD (either two-part or single-part)
-    tld = '.'.join(parts[-2:]) if len(parts) > 2 else parts[-1]
-    # Determine if TLD is two-part or single-part
-    if tld in two_part_tlds:
-        # Exclude the last three parts (two-part TLD + main domain)
-        subdomain_count = max(0, len(parts) - 3)
-    else:
-        # Exclude the last two parts (single-part TLD + main domain)
-        subdomain_count = max(0, len(parts) - 2)
-    return subdomain_count
+    # Labels left of the registrable domain, per the Public Suffix List
+    return len(parse_netloc(urlparse(url).netloc).subdomains)
 
 def calculate_avg_word_path(url):
     parsed_url = urlparse(url)
@@ -525,44 +894,28 @@ def calculate_avg_word_path(url):
     else:
         return 0  # Return 0 if there are no path segments
 
-def calculate_avg_words_raw(url):
-    try:
-        # Send a GET request to the URL
-        response = requests.get(url, timeout=TIME_LIMIT)
-        response.raise_for_status()  # Raises an error for bad responses
-        # Split the response text into words
-        words = response.text.split()
-        # Parse the URL to get the path
-        parsed_url = urlparse(url)
-        path_segments = parsed_url.path.split('/')  # Split the path into segments
-        # Calculate the average number of words per path segment
-        avg_words_raw = len(words) / len(path_segments) if path_segments else 0
-        return avg_words_raw
-    except requests.Timeout:
-        return -1  # Indicate error with -1
-    except requests.HTTPError as http_err:
-        return -1
-    except requests.RequestException as e:
+def calculate_avg_words_raw(url, page=None):
+    page = _page_for(url, page)
+    if not page.ok:
         return -1  # Indicate error with -1
+    # Number of words in the raw response text
+    words = page.word_count
+    # Parse the URL to get the path
+    parsed_url = urlparse(url)
+    path_segments = parsed_url.path.split('/')  # Split the path into segments
+    # Calculate the average number of words per path segment
+    avg_words_raw = words / len(path_segments) if path_segments else 0
+    return avg_words_raw
 
 def extract_nb_qm(url):
     return url.count('?')
 
-def extract_domain_in_brand(url):
-    try:
-        response = requests.get(url, timeout=TIME_LIMIT)
-        response.raise_for_status()  # Raises an error for bad responses
-        # Use BeautifulSoup to parse the HTML content
-        soup = BeautifulSoup(response.text, 'html.parser')
-        # Extract text from the soup and check for 'brand'
-        page_text = soup.get_text().lower()  # Get the text and convert to lowercase
-        return 1 if 'brand' in page_text else 0  # Case insensitive check
-    except requests.Timeout:
-        return -1  # Indicate error with -1
-    except requests.HTTPError as http_err:
-        return -1
-    except requests.RequestException as e:
+def extract_domain_in_brand(url, page=None):
+    page = _page_for(url, page)
+    if not page.ok:
         return -1  # Indicate error with -1
+    # Check the page text for 'brand', case insensitive
+    return 1 if page.mentions_brand else 0
 
 def shortest_word_path(url):
     # Parse the URL to extract the path
@@ -579,21 +932,14 @@ def extract_nb_and(url):
     # Count the number of occurrences of '&' in the URL
     return url.count('&')
 
-def extract_nb_extCSS(url):
-    ext_css_count = 0
-    try:
-        # Send a GET request to the URL
-        response = requests.get(url, timeout=TIME_LIMIT)
-        # response.raise_for_status()  # Raise an error for bad responses
-        # Parse the HTML content with BeautifulSoup
-        soup = BeautifulSoup(response.text, 'html.parser')
-        # Find all <link> tags that have an href attribute ending with .css
-        css_links = soup.find_all('link', href=re.compile(r'\.css$'))
-        # Count the number of external CSS files found
-        ext_css_count = len(css_links)
-        return ext_css_count
-    except requests.exceptions.RequestException as e:
+def extract_nb_extCSS(url, page=None):
+    page = _page_for(url, page)
+    if not page.fetched:
         return -1
+    # Find all <link> tags that have an href attribute ending with .css
+    css_links = [link for link in page.links if 'href' in link and CSS_HREF_PATTERN.search(link['href'])]
+    # Count the number of external CSS files found
+    return len(css_links)
 
 def extract_nb_hyphens(url):
     parsed_url = urlparse(url)
@@ -606,20 +952,15 @@ def extract_nb_slash(url):
     return parsed_url.path.count('/') + parsed_url.query.count('/')  # Include only path and query parts
 
 
-def extract_domain_with_copyright(url):
-    try:
-        # Send a GET request to the URL
-        response = requests.get(url, timeout=TIME_LIMIT)
-        response.raise_for_status()  # Raise an error for bad responses
-        # Parse the HTML content with Beautiful Soup
-        soup = BeautifulSoup(response.text, 'html.parser')
-        # Check for copyright symbol in the parsed content
-        if '©' in soup.get_text():
-            return 1  # Copyright symbol found in the content
-        else:
-            return 0  # Copyright symbol not found in content
-    except requests.exceptions.RequestException as e:
+def extract_domain_with_copyright(url, page=None):
+    page = _page_for(url, page)
+    if not page.ok:
         return -1  # Error occurred
+    # Check for copyright symbol in the parsed content
+    if page.has_copyright:
+        return 1  # Copyright symbol found in the content
+    else:
+        return 0  # Copyright symbol not found in content
 
 def extract_length(url):
   return len(url)
@@ -646,130 +987,17 @@ def extract_ratio_digits_host(url):
         ratio = 0.0  # Avoid division by zero
     return ratio
 
-def count_special_characters(url):
-    try:
-        special_chars = re.findall(r'[@!$%^&*(),?":{}|<>]', url)
-        return len(special_chars)
-    except Exception:
-        return -1
-
-def https_in_url(url):
-    try:
-        return 1 if urlparse(url).scheme == 'https' else 0
-    except Exception:
-        return -1
-
-def https_in_domain(url):
-    try:
-        domain = urlparse(url).netloc
-        return 1 if 'https' in domain else 0
-    except Exception:
-        return -1
-
-def has_prefix_suffix(url):
-    try:
-        domain = urlparse(url).netloc
-        return 1 if '-' in domain else 0
-    except Exception:
-        return -1
-
-def depth_of_url(url):
-    try:
-        path = urlparse(url).path
-        parts = [p for p in path.split('/') if p]  # Remove empty parts caused by extra slashes
-        # Check if the last part is a file (has an extension)
-        if parts and os.path.splitext(parts[-1])[1]:  # If last part has an extension, exclude it from depth count
-            return len(parts) - 1
-        return len(parts)
-    except Exception:
-        return -1
-
-def count_parameters(url):
-    try:
-        query = urlparse(url).query
-        return len(query.split('&')) if query else 0
-    except Exception:
-        return -1
-
-def uncommon_tld(url):
-    # Basic set of the most common TLDs
-    common_tlds = [
-    '.com',    # Most common for commercial businesses
-    '.org',    # Commonly used by non-profit organizations
-    '.net',    # Often used by internet service providers and tech companies
-    '.gov',    # Official government websites
-    '.edu',    # Educational institutions (universities, colleges)
-    '.mil',    # Military institutions
-    '.info',   # Information-related websites, often legitimate
-    '.co',     # Increasingly used by companies
-    '.us',     # United States-specific domains
-    '.io',     # Tech startups and organizations
-    '.biz',    # Business-related websites
-    '.me',     # Personal websites
-    '.dev',    # Development-related sites
-    '.store',  # E-commerce websites
-    '.health', # Health-related organizations
-    '.name',   # Personal branding sites
-    '.pro',    # Professional services
-    '.jobs',   # Employment and job postings
-    ]
-    try:
-        # Parse the TLD from the URL
-        domain_parts = urlparse(url).netloc.split('.')
-        if len(domain_parts) < 2:
-            return -1  # Invalid TLD or domain
-        # Extract the TLD
-        tld = '.' + domain_parts[-1].lower()  # Convert to lowercase to handle cases like .COM
-        # Mark as 0 for common TLDs, 1 for uncommon
-        return 0 if tld in common_tlds else 1
-    except Exception:
-        return -1  # Return -1 if an exception occurs
-
-def is_numeric_domain(url):
-    try:
-        # Parse the domain from the URL
-        domain = urlparse(url).netloc
-        # Split the domain into subdomains and the main domain part
-        domain_parts = domain.split('.')
-        # Check the main part of the domain for numeric-only characters
-        if domain_parts[-2].isdigit():
-            return 1  # Indicates a numeric domain
-        else:
-            return 0  # Indicates a non-numeric domain
-    except Exception:
-        return -1  # Return -1 in case of an error
-
-def domain_misspelling(url, common_words=["google", "facebook", "fb", "amazon", "instagram", "insta", "twitter", "youtube", "yt", "shopify", "paypal", "linkedin", "microsoft", "apple"]):
-    try:
-        domain = urlparse(url).netloc.split('.')[0]
-        # Regular expression to identify typical phishing patterns around brand names
-        pattern = re.compile(r'\b(?:{})\b'.format('|'.join(common_words)), re.IGNORECASE)
-        # Check if a brand name exists within the domain but isn't an exact match
-        if pattern.search(domain):
-            for word in common_words:
-                # Match if domain contains the brand but is not exactly the brand
-                if word in domain and domain != word:
-                    # Check for likely phishing additions such as "my", "login", "secure", etc.
-                    if any(prefix in domain for prefix in ["my", "login", "secure", "service", "page", "account", "help", "buy", "shop", "friends", "support", "team"]):
-                        return 1
-                    # Allow exact brand domains
-                    elif domain == word:
-                        return 0
-            return 0  # No suspicious pattern found
-        return 1  # Suspicious if unrelated to any known brand
-    except Exception:
-        return -1  # Error case
+SHORTENED_DOMAINS = frozenset({
+    'bit.ly', 'goo.gl', 'tinyurl.com', 'ow.ly', 't.co', 'buff.ly', 'adf.ly', 'bit.do',
+    'cutt.ly', 'is.gd', 'soo.gd', 's2r.co', 'shorte.st', 'lnkd.in', 't.ly', 'bl.ink',
+    'mcaf.ee', 'x.co', 'tiny.cc', 'rebrand.ly', 'trib.al', 'clck.ru', 'm.me', 'po.st',
+    'smarturl.it', 'qr.ae', 'v.gd', '0rz.tw', 'ln.is'
+})
 
 def is_url_shortened(url):
     try:
-        shortened_domains = {
-            'bit.ly', 'goo.gl', 'tinyurl.com', 'ow.ly', 't.co', 'buff.ly', 'adf.ly', 'bit.do',
-            'cutt.ly', 'is.gd', 'soo.gd', 's2r.co', 'shorte.st', 'lnkd.in', 't.ly', 'bl.ink',
-            'mcaf.ee', 'x.co', 'tiny.cc', 'rebrand.ly', 'trib.al', 'clck.ru', 'm.me', 'po.st',
-            'smarturl.it', 'qr.ae', 'v.gd', '0rz.tw', 'ln.is'
-        }
         parsed_url = urlparse(url)
-        return 1 if parsed_url.netloc in shortened_domains else 0
+        return 1 if parsed_url.netloc in SHORTENED_DOMAINS else 0
     except Exception:
         return -1
 
@@ -780,14 +1008,16 @@ valid_tlds = {
         "media", "law", "design", "photo", "fun", "tips", "life", "work", "family",
         "today", "place", "space", "win", "group", "club"
         }
+# Match domain names with valid TLDs, and the TLD at the end of a domain
+TLD_PATTERN = re.compile(r'\b(?:[a-zA-Z0-9-]+\.)+([a-zA-Z]{2,})\b')
+DOMAIN_TLD_PATTERN = re.compile(r'\.([a-z]{2,})$')
+
 def count_tld_in_url(url):
     if not isinstance(url, str):
         # logging.error(f"Invalid input type: {type(url)}. Expected string.")
         return -1  # Invalid input type
     try:
-        # Improved pattern to match only valid TLDs at the end of the domain name
-        tld_pattern = r'\b(?:[a-zA-Z0-9-]+\.)+([a-zA-Z]{2,})\b'  # Match domain names with valid TLDs
-        tld_matches = re.findall(tld_pattern, url)  # Find all TLD matches
+        tld_matches = TLD_PATTERN.findall(url)  # Find all TLD matches
         # Count unique valid TLDs
         tld_count = sum(1 for tld in tld_matches if tld in valid_tlds)
         return tld_count
@@ -797,9 +1027,7 @@ def count_tld_in_url(url):
 def count_tld_in_domain(url):
     try:
         domain = urlparse(url).netloc
-        # Use a more precise regex to capture the TLD correctly
-        tld_pattern = r'\.([a-z]{2,})$'
-        match = re.search(tld_pattern, domain)
+        match = DOMAIN_TLD_PATTERN.search(domain)
         # If a TLD match is found, return 1; otherwise, return 0
         return 1 if match else 0
     except Exception as e:
@@ -851,10 +1079,12 @@ def get_file_length(url):
     except Exception as e:
         return -1  # General error
 
-from urllib.parse import urlparse
+DOMAIN_PATTERN = re.compile(r'://(www\.)?([a-zA-Z0-9.-]+)')
+REPEATED_LETTER_PATTERN = re.compile(r'(.)\1+')
+REPEATED_VOWEL_PATTERN = re.compile(r'([aeiouAEIOU])\1+')
 
 def extract_domain(url):
-    match = re.search(r'://(www\.)?([a-zA-Z0-9.-]+)', url)
+    match = DOMAIN_PATTERN.search(url)
     return match.group(2) if match else url  # Return the domain if found, otherwise return the input URL
 
 def count_repeated_letters(url):
@@ -862,7 +1092,7 @@ def count_repeated_letters(url):
     domain = extract_domain(url)
 
     # Use the original logic on the domain
-    repeated_letters = re.findall(r'(.)\1+', domain)
+    repeated_letters = REPEATED_LETTER_PATTERN.findall(domain)
     return len(repeated_letters)
 
 def count_repeated_vowels(url):
@@ -870,7 +1100,7 @@ def count_repeated_vowels(url):
     domain = extract_domain(url)
 
     # Use the original logic on the domain
-    repeated_vowels = re.findall(r'([aeiouAEIOU])\1+', domain)
+    repeated_vowels = REPEATED_VOWEL_PATTERN.findall(domain)
     return len(repeated_vowels)
 
 def calculate_vowel_repetition_ratio(url):
@@ -878,7 +1108,7 @@ def calculate_vowel_repetition_ratio(url):
     domain = extract_domain(url)
 
     # Find repeated vowels in the domain
-    repeated_vowels = re.findall(r'([aeiouAEIOU])\1+', domain)
+    repeated_vowels = REPEATED_VOWEL_PATTERN.findall(domain)
     
     # Calculate the domain length
     domain_length = len(domain)
@@ -896,32 +1126,31 @@ def has_non_standard_port(url):
     except Exception as e:
         return -1  # Return -1 in case of an error
 
+MAX_NORMAL_URL_LENGTH = 75
+FORBIDDEN_CHARACTERS_PATTERN = re.compile(r'[<>{}|\\^~\[\]`]')
+IP_URL_PATTERN = re.compile(r'^(?:http://|https://)?(?:\d{1,3}\.){3}\d{1,3}')
+LOCALHOST_URL_PATTERN = re.compile(r'^(?:http://|https://)?(?:localhost|127\.0\.0\.1|::1|(\w+\.)?localhost)')
+# Uncommon TLDs (Top-Level Domains)
+ABNORMAL_TLDS = tuple(KEYWORDS['abnormal_tlds'])
+
 def is_abnormal_url(url):
     try:
         # Check length of the entire URL
-        if len(url) > 75:
+        if len(url) > MAX_NORMAL_URL_LENGTH:
             return 1
         # Check for forbidden characters
-        if re.search(r'[<>{}|\\^~\[\]`]', url):
+        if FORBIDDEN_CHARACTERS_PATTERN.search(url):
             return 1
         # Check if the URL contains an IP address instead of a domain name
-        if re.search(r'^(?:http://|https://)?(?:\d{1,3}\.){3}\d{1,3}', url):
+        if IP_URL_PATTERN.search(url):
             return 1
         # Check for localhost and reserved IP addresses (with or without subdomains)
-        if re.search(r'^(?:http://|https://)?(?:localhost|127\.0\.0\.1|::1|(\w+\.)?localhost)', url):
+        if LOCALHOST_URL_PATTERN.search(url):
             return 1
-        # Check for uncommon TLDs (Top-Level Domains)
-        uncommon_tlds = [
-            '.xyz', '.top', '.club', '.online', '.site',
-            '.win', '.work', '.info', '.biz', '.pw',
-            '.icu', '.ga', '.cf', '.ml', '.party',
-            '.loan', '.trade', '.gq', '.space',
-            '.mobi', '.buzz', '.link', '.bizz'  # Added '.bizz'
-        ]
         parsed_url = urlparse(url)
         domain = parsed_url.netloc
         # Check if domain ends with any uncommon TLDs
-        if any(domain.endswith(tld) for tld in uncommon_tlds):
+        if scan_host_keywords(domain)[1]:
             return 1
         # Check for excessive subdomains
         subdomains = domain.split('.')
@@ -931,215 +1160,495 @@ def is_abnormal_url(url):
     except Exception as e:
         return -1
 
-def qty_double_slash_path(url):
-    try:
-        path = urlparse(url).path
-        count = path.count('//')
-        return count
-    except Exception:
-        return -1
-
 def check_protocol(url):
     parsed_url = urlparse(url)
     return 1 if parsed_url.scheme in ['http', 'https'] else 0
 
-def extract_features(url):
-    """Extract features from the given URL."""
-    features = {}
-    parsed_url = urlparse(url)
-
-    # Timing the overall feature extraction
-    start_time = time.time()
-
-    try:
-        # Feature 1: Google Index
-        features['google_index'] = get_google_index(url)
-
-        # Feature 3: Number of hyperlinks
-        features['nb_hyperlinks'] = extract_hyperlink_count(url)
-
-        # Feature 4: Web Traffic
-        features['web_traffic'] = get_web_traffic(url)
-
-        # Feature 5: Number of "www" in hostname
-        features['nb_www'] = parsed_url.netloc.count('www')
-
-        # Feature 6: Ratio of external hyperlinks
-        features['ratio_extHyperlinks'] = calculate_ratio_extHyperlinks(url)
-
-        # Feature 7: Domain Age
-        features['domain_age'] = get_domain_age(url)
-
-        # Feature 8: Phishing hints
-        features['phish_hints'] = extract_phishing_hints(url)
-
-        # Feature 9: Safe anchor
-        features['safe_anchor'] = extract_safe_anchor(url)
-
-        # Feature 10: Ratio of digits in URL
-        features['ratio_digits_url'] = calculate_ratio_digits_url(url)
-
-        # Feature 11: Length of URL
-        features['length_url'] = extract_length(url)
+# Column order of the feature frame returned by extract_features
+FEATURE_NAMES = [
+    'google_index', 'nb_hyperlinks', 'web_traffic', 'nb_www', 'ratio_extHyperlinks',
+    'domain_age', 'phish_hints', 'safe_anchor', 'ratio_digits_url', 'length_url', 'avg_word_path',
+    'length_hostname', 'ratio_extRedirection', 'longest_words_raw', 'length_words_raw', 'nb_dots',
+    'links_in_tags', 'domain_registration_length', 'nb_slash', 'domain_in_title', 'avg_words_raw',
+    'shortest_word_path', 'ip', 'nb_hyphens', 'avg_word_host', 'ratio_digits_host', 'ratio_intMedia',
+    'nb_qm', 'domain_with_copyright', 'ratio_extMedia', 'nb_extCSS', 'nb_subdomains', 'domain_in_brand',
+    'nb_and', 'nb_special_characters', 'https_in_url', 'https_in_domain', 'has_prefix_suffix',
+    'depth_of_url', 'count_parameters', 'uncommon_tld', 'is_numeric_domain', 'domain_misspelling', 'qty_double_slash_path',
+    'non_standard_port', 'abnormal_url', 'url_shortened', 'tld_count_in_url', 'tld_count_in_domain',
+    'tilde_count', 'asterisk_count', 'dollar_count', 'file_length', 'repeated_letters', 'repeated_vowels', 'vowel_repetition_ratio'
+]
 
-        # Feature 12: Average word length in path
-        features['avg_word_path'] = calculate_avg_word_path(url)
+REQUEST_DEADLINE = 6  # Overall time budget in seconds for the network sources of one URL
+SOURCE_WORKERS = 32  # Threads shared by the network sources of all requests
+
+_source_executor = ThreadPoolExecutor(max_workers=SOURCE_WORKERS, thread_name_prefix='feature-source')
+
+def set_source_workers(workers):
+    """Replace the shared source pool with one of `workers` threads, for bulk jobs running many URLs at once."""
+    global _source_executor
+    previous = _source_executor
+    _source_executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='feature-source')
+    previous.shutdown(wait=False)
+
+# Content features computed from a single page snapshot
+CONTENT_FEATURES = {
+    'nb_hyperlinks': extract_hyperlink_count,
+    'ratio_extHyperlinks': calculate_ratio_extHyperlinks,
+    'ratio_extRedirection': calculate_ratio_extHyperlinks,
+    'links_in_tags': extract_links_in_tags,
+    'domain_in_title': check_domain_in_title,
+    'avg_words_raw': calculate_avg_words_raw,
+    'ratio_intMedia': extract_ratio_intMedia,
+    'domain_with_copyright': extract_domain_with_copyright,
+    'ratio_extMedia': extract_ratio_extMedia,
+    'nb_extCSS': extract_nb_extCSS,
+    'domain_in_brand': extract_domain_in_brand,
+}
 
-        # Feature 13: Length of hostname
-        features['length_hostname'] = extract_length_hostname(url)
+def _page_source(url, deadline=None):
+    page = new_page_snapshot(url, deadline=deadline)
+    # The fetch and the parse are timed apart from the features sharing them
+    started = time.perf_counter()
+    page.fetch()
+    metrics.FEATURE_SECONDS.labels('page_fetch').observe(time.perf_counter() - started)
+    started = time.perf_counter()
+    page.parse()
+    metrics.FEATURE_SECONDS.labels('page_parse').observe(time.perf_counter() - started)
+    values = {}
+    for name, feature in CONTENT_FEATURES.items():
+        started = time.perf_counter()
+        values[name] = feature(url, page)
+        metrics.FEATURE_SECONDS.labels(name).observe(time.perf_counter() - started)
+    return values
+
+def _whois_source(url):
+    # One lookup serves both registration features
+    result = lookup_whois(url)
+    return {
+        'domain_age': get_domain_age(url, result),
+        'domain_registration_length': extract_domain_registration_length(url, result),
+    }
 
-        # Feature 14: ratio_extRedirection
-        features['ratio_extRedirection'] = calculate_ratio_extHyperlinks(url)
+try:
+    domain_store = DomainFeatureStore(DOMAIN_CACHE_PATH, DOMAIN_FEATURE_TTLS, DOMAIN_CACHE_NEGATIVE_TTL)
+except sqlite3.Error as e:
+    logging.warning(f"Domain feature cache disabled: {str(e)}")
+    domain_store = None
+
+# Independent network-bound sources: name -> (function of the URL and the
+# request's deadline returning a feature dict, sentinel values used when the
+# source fails or misses the deadline). The HTTP sources stop reading at the
+# deadline; WHOIS and DNS lookups are bounded by their own timeouts
+NETWORK_SOURCES = {
+    'google_index': (lambda url, deadline: {'google_index': get_google_index(url, deadline)}, {'google_index': -1}),
+    'web_traffic': (lambda url, deadline: {'web_traffic': get_web_traffic(url, deadline)}, {'web_traffic': 0}),
+    'whois': (lambda url, deadline: _whois_source(url), {'domain_age': -1, 'domain_registration_length': 0}),
+    'ip': (lambda url, deadline: {'ip': extract_ip_feature(url)}, {'ip': -1}),
+    'page': (_page_source, {name: -1 for name in CONTENT_FEATURES}),
+}
 
-        # Feature 15: longest_words_raw
-        features['longest_words_raw'] = extract_longest_words_raw(url)
+# Features that need network access, and those computed from the URL string
+# alone (in FEATURE_NAMES order)
+NETWORK_FEATURES = {name for _, fallback in NETWORK_SOURCES.values() for name in fallback}
+LEXICAL_FEATURES = [name for name in FEATURE_NAMES if name not in NETWORK_FEATURES]
+
+# Sources whose results depend only on the domain and are kept in domain_store
+DOMAIN_SOURCES = {'google_index', 'web_traffic', 'whois', 'ip'}
+
+def _domain_cache_key(name, url):
+    netloc = urlparse(url).netloc
+    # DNS resolvability is a property of the exact host
+    if name == 'ip':
+        return netloc.lower()
+    # Registration is shared by every tenant of github.io and the like, the
+    # site's ranking and traffic are not
+    return registrable_domain(netloc, private=name != 'whois')
+
+def _cached_source(name, url):
+    if domain_store is None or name not in DOMAIN_SOURCES:
+        return None
+    try:
+        cached = domain_store.get(_domain_cache_key(name, url), NETWORK_SOURCES[name][1])
+    except sqlite3.Error as e:
+        logging.warning(f"Domain feature cache read failed: {str(e)}")
+        return None
+    metrics.CACHE_REQUESTS.labels('domain', 'miss' if cached is None else 'hit').inc()
+    return cached
+
+def _is_negative(name, url, values):
+    # Empty WHOIS records map to defaults rather than the sentinels, the
+    # outcome of the lookup (served from _whois_cache) tells them apart
+    if name == 'whois':
+        return lookup_whois(url)[0] != WHOIS_OK
+    return values == NETWORK_SOURCES[name][1]
+
+def _store_source(name, url, values):
+    if domain_store is None or name not in DOMAIN_SOURCES:
+        return
+    try:
+        # Failed and empty results are only kept for the short negative TTL
+        domain_store.put(_domain_cache_key(name, url), values, negative=_is_negative(name, url, values))
+    except sqlite3.Error as e:
+        logging.warning(f"Domain feature cache write failed: {str(e)}")
+
+def extract_lexical_features(url):
+    """
+    Compute the features that depend only on the URL string.
+
+    The URL is parsed once and its characters are counted in a single pass;
+    every feature is derived from these shared pieces with the module-level
+    patterns and lookup sets. The values match the per-feature functions
+    above exactly.
+    """
+    parsed_url = urlparse(url)
+    netloc = parsed_url.netloc
+    path = parsed_url.path
+    query = parsed_url.query
+    url_lower = url.lower()
+    url_chars = Counter(url)
+    host_parts = netloc.split('.')
+    path_segments = [segment for segment in path.split('/') if segment]
+    words = WORD_PATTERN.findall(url)
+    unsafe_host, abnormal_tld, misspelling = scan_host_keywords(netloc)
+    domain = extract_domain(url)
+    repeated_vowels = len(REPEATED_VOWEL_PATTERN.findall(domain))
+    features = {}
 
-        # Feature 16: length_words_raw
-        features['length_words_raw'] = extract_length_words_raw(url)
+    # Feature 5: Number of "www" in hostname
+    features['nb_www'] = netloc.count('www')
 
-        # Feature 17: Number of dots in hostname
-        features['nb_dots'] = count_dots(url)
+    # Feature 8: Phishing hints
+    features['phish_hints'] = len(KEYWORD_MATCHER.keywords_in(url_lower, 'phishing_hints'))
 
-        # Feature 18: links_in_tags
-        features['links_in_tags'] = extract_links_in_tags(url)
+    # Feature 9: Safe anchor
+    domain_extension = host_parts[-1] if '.' in netloc else ''
+    is_safe = (url_lower.startswith('https://')
+               and not unsafe_host
+               and domain_extension in COMMON_SAFE_EXTENSIONS
+               and len(url) <= MAX_SAFE_URL_LENGTH)
+    features['safe_anchor'] = 1 if is_safe else 0
 
-        # Feature 19: domain_registration_length
-        features['domain_registration_length'] = extract_domain_registration_length(url)
+    # Feature 10: Ratio of digits in URL
+    url_digits = sum(count for char, count in url_chars.items() if char.isdigit())
+    features['ratio_digits_url'] = url_digits / len(url) if url else 0
 
-        # Feature 20: Number of slashes in URL
-        features['nb_slash'] = extract_nb_slash(url)
+    # Feature 11: Length of URL
+    features['length_url'] = len(url)
 
-        # Feature 21: Domain in title
-        features['domain_in_title'] = check_domain_in_title(url)
+    # Feature 12: Average word length in path
+    features['avg_word_path'] = sum(map(len, path_segments)) / len(path_segments) if path_segments else 0
 
-        # Feature 22: Average words in raw text
-        features['avg_words_raw'] = calculate_avg_words_raw(url)
+    # Feature 13: Length of hostname
+    hostname = parsed_url.hostname
+    features['length_hostname'] = len(hostname) if hostname else 0
 
-        # Feature 23: Shortest word in path
-        features['shortest_word_path'] = shortest_word_path(url)
+    # Feature 15: longest_words_raw
+    features['longest_words_raw'] = max(map(len, words)) if words else 0
 
-        # Feature 24: Presence of IP in the URL
-        features['ip'] = extract_ip_feature(url)
+    # Feature 16: length_words_raw
+    features['length_words_raw'] = sum(len(word) for word in words if word.lower() not in LENGTH_WORDS_EXCLUDED)
 
-        # Feature 25: Number of hyphens in hostname
-        features['nb_hyphens'] = extract_nb_hyphens(url)
+    # Feature 17: Number of dots in hostname
+    features['nb_dots'] = netloc.count('.')
 
-        # Feature 26: Average word length in hostname
-        features['avg_word_host'] = extract_avg_word_host(url)
+    # Feature 20: Number of slashes in URL
+    features['nb_slash'] = path.count('/') + query.count('/')
 
-        # Feature 27: Ratio of digits in hostname
-        features['ratio_digits_host'] = extract_ratio_digits_host(url)
+    # Feature 23: Shortest word in path
+    features['shortest_word_path'] = min(map(len, path_segments)) if path_segments else 0
 
-        # Feature 28: ratio_intMedia
-        features['ratio_intMedia'] = extract_ratio_intMedia(url)
+    # Feature 25: Number of hyphens in hostname
+    features['nb_hyphens'] = netloc.count('-')
 
-        # Feature 29: Number of query parameters in URL
-        features['nb_qm'] = extract_nb_qm(url)
+    # Feature 26: Average word length in hostname
+    features['avg_word_host'] = sum(map(len, host_parts)) / len(host_parts)
 
-        # Feature 30: Domain with copyright
-        features['domain_with_copyright'] = extract_domain_with_copyright(url)
+    # Feature 27: Ratio of digits in hostname
+    host_digits = sum(1 for char in netloc if char.isdigit())
+    features['ratio_digits_host'] = host_digits / len(netloc) if netloc else 0.0
 
-        # Feature 31: ratio_extMedia
-        features['ratio_extMedia'] = extract_ratio_extMedia(url)
+    # Feature 29: Number of query parameters in URL
+    features['nb_qm'] = url_chars['?']
 
-        # Feature 32: Number of external CSS
-        features['nb_extCSS'] = extract_nb_extCSS(url)
+    # Feature 33: Number of subdomains
+    features['nb_subdomains'] = len(parse_netloc(netloc).subdomains)
 
-        # Feature 33: Number of subdomains
-        features['nb_subdomains'] = extract_nb_subdomains(url)
+    # Feature 35: Number of occurrences of 'and' in URL
+    features['nb_and'] = url_chars['&']
 
-        # Feature 34: Domain in brand
-        features['domain_in_brand'] = extract_domain_in_brand(url)
+    # Feature 36: count special characters in URL
+    features['nb_special_characters'] = sum(url_chars[char] for char in SPECIAL_CHARACTERS)
 
-        # Feature 35: Number of occurrences of 'and' in URL
-        features['nb_and'] = extract_nb_and(url)
+    # Feature 37: check if URL uses HTTPS
+    features['https_in_url'] = 1 if parsed_url.scheme == 'https' else 0
 
-        # Feature 36: count special characters in URL
-        features['nb_special_characters'] = count_special_characters(url)
+    # Feature 38: check if domain uses HTTPS
+    features['https_in_domain'] = 1 if 'https' in netloc else 0
 
-        # Feature 37: check if URL uses HTTPS
-        features['https_in_url'] = https_in_url(url)
+    # Feature 39: check for prefix-suffix in domain (indicated by '-')
+    features['has_prefix_suffix'] = 1 if '-' in netloc else 0
 
-        # Feature 38: check if domain uses HTTPS
-        features['https_in_domain'] = https_in_domain(url)
+    # Feature 40: calculate URL depth (count of '/' in path)
+    if path_segments and os.path.splitext(path_segments[-1])[1]:
+        features['depth_of_url'] = len(path_segments) - 1
+    else:
+        features['depth_of_url'] = len(path_segments)
 
-        # Feature 39: check for prefix-suffix in domain (indicated by '-')
-        features['has_prefix_suffix'] = has_prefix_suffix(url)
+    # Feature 41: count parameters in URL
+    features['count_parameters'] = len(query.split('&')) if query else 0
 
-        # Feature 40: calculate URL depth (count of '/' in path)
-        features['depth_of_url'] = depth_of_url(url)
+    # Feature 42: check for uncommon TLD
+    if len(host_parts) < 2:
+        features['uncommon_tld'] = -1
+    else:
+        features['uncommon_tld'] = 0 if '.' + host_parts[-1].lower() in COMMON_TLDS else 1
 
-        # Feature 41: count parameters in URL
-        features['count_parameters'] = count_parameters(url)
+    # Feature 43: check if the main part of the domain is numeric
+    if len(host_parts) < 2:
+        features['is_numeric_domain'] = -1
+    else:
+        features['is_numeric_domain'] = 1 if host_parts[-2].isdigit() else 0
 
-        # Feature 42: check for uncommon TLD
-        features['uncommon_tld'] = uncommon_tld(url)
+    # Feature 44: check domain misspelling using common patterns and brand detection
+    features['domain_misspelling'] = misspelling
 
-        # Feature 43: check if the main part of the domain is numeric
-        features['is_numeric_domain'] = is_numeric_domain(url)
+    # Feature 45: count occurrences of double slashes '//' in URL path
+    features['qty_double_slash_path'] = path.count('//')
 
-        # Feature 44: check domain misspelling using common patterns and brand detection
-        features['domain_misspelling'] = domain_misspelling(url)
+    # Feature 46: Check for non-standard ports
+    try:
+        port = parsed_url.port
+    except ValueError:
+        port = None
+    features['non_standard_port'] = (0 if port in [80, 443] else 1) if port else -1
 
-        # Feature 45: count occurrences of double slashes '//' in URL path
-        features['qty_double_slash_path'] = qty_double_slash_path(url)
+    # Feature 47: Check for abnormal URL patterns
+    abnormal = (len(url) > MAX_NORMAL_URL_LENGTH
+                or FORBIDDEN_CHARACTERS_PATTERN.search(url)
+                or IP_URL_PATTERN.search(url)
+                or LOCALHOST_URL_PATTERN.search(url)
+                or abnormal_tld
+                or len(host_parts) > 3)
+    features['abnormal_url'] = 1 if abnormal else 0
 
-        # Feature 46: Check for non-standard ports
-        features['non_standard_port'] = has_non_standard_port(url)
+    # Feature 48: Check if the URL is shortened
+    features['url_shortened'] = 1 if netloc in SHORTENED_DOMAINS else 0
 
-        # Feature 47: Check for abnormal URL patterns
-        features['abnormal_url'] = is_abnormal_url(url)
+    # Feature 49: Count the number of TLDs (Top-Level Domains) in the URL
+    features['tld_count_in_url'] = sum(1 for tld in TLD_PATTERN.findall(url) if tld in valid_tlds)
 
-        # Feature 48: Check if the URL is shortened
-        features['url_shortened'] = is_url_shortened(url)
+    # Feature 50: Count the number of TLDs in the domain part of the URL
+    features['tld_count_in_domain'] = 1 if DOMAIN_TLD_PATTERN.search(netloc) else 0
 
-        # Feature 49: Count the number of TLDs (Top-Level Domains) in the URL
-        features['tld_count_in_url'] = count_tld_in_url(url)
+    # Feature 51: Count the number of tilde characters in the URL
+    features['tilde_count'] = url_chars['~']
 
-        # Feature 50: Count the number of TLDs in the domain part of the URL
-        features['tld_count_in_domain'] = count_tld_in_domain(url)
+    # Feature 52: Count the number of asterisk characters in the URL
+    features['asterisk_count'] = url_chars['*']
 
-        # Feature 51: Count the number of tilde characters in the URL
-        features['tilde_count'] = count_tilde_in_url(url)
+    # Feature 53: Count the number of dollar characters in the URL
+    features['dollar_count'] = url_chars['$']
 
-        # Feature 52: Count the number of asterisk characters in the URL
-        features['asterisk_count'] = count_asterisk_in_url(url)
+    # Feature 54: Get the length of the file part of the URL
+    features['file_length'] = len(path.rsplit('/', 1)[-1])
 
-        # Feature 53: Count the number of dollar characters in the URL
-        features['dollar_count'] = count_dollar_in_url(url)
+    # Feature 55: Count the groups of consecutive repeated letters in the domain of the URL
+    features['repeated_letters'] = len(REPEATED_LETTER_PATTERN.findall(domain))
 
-        # Feature 54: Get the length of the file part of the URL
-        features['file_length'] = get_file_length(url)
+    # Feature 56: Count the groups of consecutive repeated vowels in the domain of the URL
+    features['repeated_vowels'] = repeated_vowels
 
-        # Feature 55: Count the groups of consecutive repeated letters in the domain of the URL
-        features['repeated_letters'] = count_repeated_letters(url)
+    # Feature 57: Calculate the ratio of repeated vowels to the total length of the domain
+    features['vowel_repetition_ratio'] = round(repeated_vowels / len(domain), 3) if domain else 0
 
-        # Feature 56: Count the groups of consecutive repeated vowels in the domain of the URL
-        features['repeated_vowels'] = count_repeated_vowels(url)
+    return features
 
-        # Feature 57: Calculate the ratio of repeated vowels to the total length of the domain
-        features['vowel_repetition_ratio'] = calculate_vowel_repetition_ratio(url)
+def _lexical_rows(urls):
+    # One row of lexical features per URL and a mask of the URLs that failed
+    rows = []
+    failed = [False] * len(urls)
+    for index, url in enumerate(urls):
+        try:
+            rows.append(extract_lexical_features(url))
+        except Exception:
+            failed[index] = True
+            rows.append({name: -1 for name in LEXICAL_FEATURES})
+    return rows, failed
+
+def extract_lexical_features_batch(urls):
+    """
+    Compute the lexical features of many URLs at once.
+
+    `urls` is any sequence or Series of URL strings. Rows come from the
+    single-pass extract_lexical_features and are assembled into one frame,
+    instead of a DataFrame per URL. URLs that cannot be parsed get -1 for
+    every feature, like a failed extract_features call. Returns a DataFrame
+    with one row per URL and the LEXICAL_FEATURES columns.
+    """
+    rows, _ = _lexical_rows(list(urls))
+    return pd.DataFrame.from_records(rows, columns=LEXICAL_FEATURES)
+
+def _run_source(name, url, deadline):
+    # Runs on the source pool and returns (values, error, wall seconds, CPU
+    # seconds); the metrics are recorded even if the request stopped waiting
+    wall_started, cpu_started = time.perf_counter(), time.thread_time()
+    values, error = None, None
+    try:
+        values = NETWORK_SOURCES[name][0](url, deadline)
+    except Exception as e:
+        error = e
+    wall, cpu = time.perf_counter() - wall_started, time.thread_time() - cpu_started
+    metrics.SOURCE_SECONDS.labels(name).observe(wall)
+    metrics.SOURCE_CPU_SECONDS.labels(name).observe(cpu)
+    return values, error, wall, cpu
+
+def _record_source(trace, name, outcome, wall=None, cpu=None):
+    metrics.SOURCE_RESULTS.labels(name, outcome).inc()
+    if trace is not None:
+        entry = {'outcome': outcome}
+        if wall is not None:
+            entry.update(wall_ms=round(wall * 1000, 2), cpu_ms=round(cpu * 1000, 2))
+        trace.setdefault('sources', {})[name] = entry
+
+def iter_network_features(url, futures, deadline, trace=None):
+    """
+    Yield (source name, feature dict) for the submitted sources as they
+    complete until `deadline` (a time.monotonic() value), then the sentinel
+    values of the sources still running. Failed sources yield their
+    sentinel values too. Closing the generator early cancels what is left.
+    Outcomes and timings are added to the `trace` dict when one is given.
+    """
+    pending = dict(futures)
+    try:
+        try:
+            for future in as_completed(futures, timeout=max(0, deadline - time.monotonic())):
+                name = pending.pop(future)
+                values, error, wall, cpu = future.result()
+                if error is not None:
+                    logging.warning(f"Source '{name}' failed for {url}: {str(error)}")
+                    _record_source(trace, name, 'error', wall, cpu)
+                    yield name, NETWORK_SOURCES[name][1]
+                    continue
+                _record_source(trace, name, 'ok', wall, cpu)
+                _store_source(name, url, values)
+                yield name, values
+        except FuturesTimeoutError:
+            pass
+        while pending:
+            future, name = pending.popitem()
+            future.cancel()
+            logging.warning(f"Source '{name}' missed the deadline for {url}, using fallback values.")
+            _record_source(trace, name, 'timeout')
+            yield name, NETWORK_SOURCES[name][1]
+    finally:
+        for future in pending:
+            future.cancel()
+
+def collect_network_features(url, futures, deadline, trace=None):
+    """
+    Wait until `deadline` (a time.monotonic() value) for the submitted sources
+    and merge their results, using the sentinel values of any source that
+    failed or is still running.
+    """
+    features = {}
+    for _, values in iter_network_features(url, futures, deadline, trace):
+        features.update(values)
+    return features
+
+def start_network_sources(url, trace=None, deadline=None):
+    """
+    Return the cached network features of `url` and a {future: source name}
+    dict for every source that has to be fetched, started concurrently.
+    The sources stop their downloads at `deadline` (a time.monotonic()
+    value, by default REQUEST_DEADLINE from now).
+    """
+    if deadline is None:
+        deadline = time.monotonic() + REQUEST_DEADLINE
+    features = {}
+    futures = {}
+    for name in NETWORK_SOURCES:
+        cached = _cached_source(name, url)
+        if cached is not None:
+            features.update(cached)
+            _record_source(trace, name, 'cached')
+        else:
+            futures[_source_executor.submit(_run_source, name, url, deadline)] = name
+    return features, futures
+
+def timed_lexical_features(url, trace=None):
+    """extract_lexical_features, timed."""
+    started = time.perf_counter()
+    features = extract_lexical_features(url)
+    elapsed = time.perf_counter() - started
+    metrics.FEATURE_SECONDS.labels('lexical').observe(elapsed)
+    if trace is not None:
+        trace['lexical_ms'] = round(elapsed * 1000, 3)
+    return features
+
+def extract_features(url, deadline=REQUEST_DEADLINE, trace=None):
+    """
+    Extract features from the given URL. Given a `trace` dict, the outcome
+    and timing of every source and of the lexical features are added to it.
+    """
+    # Timing the overall feature extraction
+    start_time = time.monotonic()
 
+    # Start every network source that is not cached concurrently
+    features, futures = start_network_sources(url, trace, start_time + deadline)
 
+    try:
+        # Compute the URL-only features while the network sources are in flight
+        features.update(timed_lexical_features(url, trace))
+        features.update(collect_network_features(url, futures, start_time + deadline, trace))
 
-        features_df = pd.DataFrame([features])
+        features_df = pd.DataFrame([{name: features[name] for name in FEATURE_NAMES}])
         # features_df = [features]
         return features_df
     except Exception as e:
         # If an exception occurs, create a DataFrame with all-zero values
-        feature_names = [
-            'google_index', 'nb_hyperlinks', 'web_traffic', 'nb_www', 'ratio_extHyperlinks',
-            'domain_age', 'phish_hints', 'safe_anchor', 'ratio_digits_url', 'length_url', 'avg_word_path',
-            'length_hostname', 'ratio_extRedirection', 'longest_words_raw', 'length_words_raw', 'nb_dots',
-            'links_in_tags', 'domain_registration_length', 'nb_slash', 'domain_in_title', 'avg_words_raw',
-            'shortest_word_path', 'ip', 'nb_hyphens', 'avg_word_host', 'ratio_digits_host', 'ratio_intMedia',
-            'nb_qm', 'domain_with_copyright', 'ratio_extMedia', 'nb_extCSS', 'nb_subdomains', 'domain_in_brand',
-            'nb_and', 'nb_special_characters', 'https_in_url', 'https_in_domain', 'has_prefix_suffix',
-            'depth_of_url', 'count_parameters', 'uncommon_tld', 'is_numeric_domain', 'domain_misspelling', 'qty_double_slash_path',
-            'non_standard_port', 'abnormal_url', 'url_shortened', 'tld_count_in_url', 'tld_count_in_domain',
-            'tilde_count', 'asterisk_count', 'dollar_count', 'file_length', 'repeated_letters', 'repeated_vowels', 'vowel_repetition_ratio'
-        ]
-        features_df = pd.DataFrame([{feature: -1 for feature in feature_names}])
+        for future in futures:
+            future.cancel()
+        features_df = pd.DataFrame([{feature: -1 for feature in FEATURE_NAMES}])
         # features_df = [{feature: -1 for feature in feature_names}]
         return features_df
-
+    finally:
+        elapsed = time.monotonic() - start_time
+        metrics.EXTRACTION_SECONDS.observe(elapsed)
+        if trace is not None:
+            trace['extraction_ms'] = round(elapsed * 1000, 2)
+
+# URLs whose network sources run at once in extract_features_batch
+NETWORK_BATCH_WINDOW = max(1, SOURCE_WORKERS // len(NETWORK_SOURCES))
+
+def extract_features_batch(urls, include_network=True, deadline=REQUEST_DEADLINE):
+    """
+    Extract the features of many URLs into one DataFrame, with a row per URL
+    and the FEATURE_NAMES columns (the model's column order).
+
+    Lexical features come from the single-pass extract_lexical_features.
+    With `include_network`, the network sources run for NETWORK_BATCH_WINDOW
+    URLs at a time, each window sharing one `deadline`; otherwise the network
+    columns hold the sentinel values used when a source fails.
+    """
+    urls = list(urls)
+    rows, failed = _lexical_rows(urls)
+    fallback = {name: value for _, values in NETWORK_SOURCES.values() for name, value in values.items()}
+    network_rows = [fallback] * len(urls)
+
+    if include_network:
+        # URLs that failed to parse are all -1 anyway, so their sources are skipped
+        indices = [index for index in range(len(urls)) if not failed[index]]
+        for start in range(0, len(indices), NETWORK_BATCH_WINDOW):
+            window_start = time.monotonic()
+            window = [
+                (index, start_network_sources(urls[index], deadline=window_start + deadline))
+                for index in indices[start:start + NETWORK_BATCH_WINDOW]
+            ]
+            for index, (features, futures) in window:
+                features.update(collect_network_features(urls[index], futures, window_start + deadline))
+                network_rows[index] = features
+
+    for index, network_row in enumerate(network_rows):
+        # Rows whose URL could not be parsed are -1 throughout, as in extract_features
+        rows[index].update({name: -1 for name in NETWORK_FEATURES} if failed[index] else network_row)
+    return pd.DataFrame.from_records(rows, columns=FEATURE_NAMES)
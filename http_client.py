@@ -0,0 +1,164 @@
+import threading
+import time
+from contextlib import contextmanager
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import DecodeError, ProtocolError, ReadTimeoutError
+from urllib3.util.retry import Retry
+
+from cache import TTLCache
+from circuit_breaker import CircuitOpenError, get_breaker
+
+CONNECT_TIMEOUT = 3  # Seconds to establish a connection
+READ_TIMEOUT = 3  # Seconds to wait for data between bytes
+MAX_BODY_BYTES = 2 * 1024 * 1024  # Bodies are truncated after this many bytes
+MAX_CONNECTIONS_PER_HOST = 8  # Concurrent requests and pooled connections per host
+POOLED_HOSTS = 200  # Number of per-host connection pools kept alive
+CHUNK_SIZE = 64 * 1024
+
+# Retry connection failures and transient gateway errors once, with backoff
+RETRY_POLICY = Retry(
+    total=1,
+    connect=1,
+    read=0,
+    status=1,
+    backoff_factor=0.3,
+    status_forcelist=[502, 503, 504],
+    allowed_methods=['GET'],
+    raise_on_status=False,
+)
+
+class HostBusyError(requests.exceptions.ConnectionError):
+    """Raised when a host already has MAX_CONNECTIONS_PER_HOST requests in flight."""
+
+class DeadlineExceededError(requests.exceptions.Timeout):
+    """Raised when a request or the reading of its body outlasts the caller's deadline."""
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOLED_HOSTS,
+        pool_maxsize=MAX_CONNECTIONS_PER_HOST,
+        max_retries=RETRY_POLICY,
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# One keep-alive session shared by every fetcher, reusing TCP and TLS connections
+session = _build_session()
+
+_host_slots = TTLCache(maxsize=10000, ttl=60 * 60)
+
+def _slots_for(host):
+    return _host_slots.get_or_compute(host, lambda: threading.BoundedSemaphore(MAX_CONNECTIONS_PER_HOST))
+
+def set_max_connections_per_host(connections):
+    """
+    Allow `connections` concurrent requests and pooled connections per host,
+    for bulk jobs sending every URL to the same providers. Call it before
+    the first request: requests already in flight keep their old slots.
+    """
+    global MAX_CONNECTIONS_PER_HOST
+    MAX_CONNECTIONS_PER_HOST = connections
+    # New connection pools of the new size in the adapters already mounted
+    for adapter in set(session.adapters.values()):
+        adapter.init_poolmanager(POOLED_HOSTS, connections)
+    _host_slots.clear()
+
+@contextmanager
+def stream(url, headers=None, timeout=None, provider=None, deadline=None):
+    """
+    GET `url` through the shared session without reading the body: yields the
+    response for the caller to read with iter_body, then releases its
+    connection and host slot. With a `provider`, the call goes through that
+    provider's circuit breaker and raises CircuitOpenError at once while the
+    circuit is open. A `deadline` (a time.monotonic() value) caps the connect
+    and read timeouts. Raises requests.RequestException subclasses.
+    """
+    host = urlparse(url).netloc.lower()
+    timeout = timeout or (CONNECT_TIMEOUT, READ_TIMEOUT)
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceededError(f"Deadline passed before requesting {url}")
+        connect_timeout, read_timeout = timeout if isinstance(timeout, tuple) else (timeout, timeout)
+        timeout = (min(connect_timeout, remaining), min(read_timeout, remaining))
+    slots = _slots_for(host)
+    # Waiting for a slot is our own congestion, not the provider's, so it
+    # happens before the breaker is asked and is never recorded
+    if not slots.acquire(timeout=CONNECT_TIMEOUT):
+        raise HostBusyError(f"Too many concurrent requests to {host}")
+    try:
+        breaker = get_breaker(provider) if provider else None
+        permit = breaker.allow() if breaker is not None else None
+        if breaker is not None and permit is None:
+            raise CircuitOpenError(f"Circuit for {provider} is open, skipping {url}")
+        started = time.monotonic()
+        success = False
+        try:
+            response = session.get(url, headers=headers, timeout=timeout, stream=True)
+            try:
+                # Errors while the caller reads the body propagate from the yield
+                yield response
+                success = breaker is None or response.status_code not in breaker.failure_statuses
+            finally:
+                # Returns the connection to the pool if the body was fully read
+                response.close()
+        finally:
+            if breaker is not None:
+                breaker.record(permit, success, time.monotonic() - started)
+    finally:
+        slots.release()
+
+def _chunks_until(response, deadline):
+    # iter_content waits until a whole chunk has arrived, which a server
+    # dripping a few bytes at a time can put off forever; read1 returns what
+    # one read of the socket got. urllib3 errors are raised as iter_content would
+    while True:
+        if time.monotonic() >= deadline:
+            raise DeadlineExceededError(f"Deadline passed while reading {response.url}")
+        try:
+            chunk = response.raw.read1(CHUNK_SIZE, decode_content=True)
+        except ReadTimeoutError as e:
+            raise requests.exceptions.ConnectionError(e)
+        except ProtocolError as e:
+            raise requests.exceptions.ChunkedEncodingError(e)
+        except DecodeError as e:
+            raise requests.exceptions.ContentDecodingError(e)
+        if not chunk:
+            return
+        yield chunk
+
+def iter_body(response, max_bytes=MAX_BODY_BYTES, deadline=None):
+    """
+    Yield the body of a streamed response in chunks, stopping after
+    `max_bytes`; `response.truncated` tells whether it was cut. Past
+    `deadline` (a time.monotonic() value) reading stops with
+    DeadlineExceededError, so a slow server cannot hold the caller longer
+    than the deadline and one read timeout.
+    """
+    response.truncated = False
+    received = 0
+    chunks = response.iter_content(CHUNK_SIZE) if deadline is None else _chunks_until(response, deadline)
+    for chunk in chunks:
+        received += len(chunk)
+        if received >= max_bytes:
+            response.truncated = True
+            yield chunk[:len(chunk) - (received - max_bytes)]
+            return
+        yield chunk
+
+def get(url, headers=None, timeout=None, max_bytes=MAX_BODY_BYTES, provider=None, deadline=None):
+    """
+    GET `url` through the shared session and return the response with its body
+    read. At most `max_bytes` of the body are downloaded; `response.truncated`
+    tells whether it was cut. `provider` names the circuit breaker guarding
+    the call and `deadline` bounds the whole call (see stream and iter_body).
+    Raises requests.RequestException subclasses.
+    """
+    with stream(url, headers=headers, timeout=timeout, provider=provider, deadline=deadline) as response:
+        response._content = b''.join(iter_body(response, max_bytes, deadline))
+    return response
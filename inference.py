@@ -0,0 +1,215 @@
+import json
+import logging
+
+import numpy as np
+import pandas as pd
+
+VALIDATION_ROWS = 512  # Random feature rows compared with the models at load time
+TOLERANCE = 1e-5  # Largest accepted probability difference from predict_proba
+
+def _at_most(thresholds):
+    # Largest float32 not above each threshold, so `x <= t` keeps its result
+    # for every float32 x once t is stored as float32
+    rounded = thresholds.astype(np.float32)
+    too_high = rounded.astype(np.float64) > thresholds
+    rounded[too_high] = np.nextafter(rounded[too_high], np.float32(-np.inf))
+    return rounded
+
+def _below(thresholds):
+    # `x < t` on float32 values is `x <= t'` with t' the float32 just below t
+    thresholds = np.asarray(thresholds, dtype=np.float32)
+    return np.nextafter(thresholds, np.float32(-np.inf))
+
+class FlatTrees:
+    """
+    Trees of one model flattened into contiguous arrays indexed by a global
+    node id. A sample goes left when `x[feature] <= threshold` (float32), or
+    when the feature is missing and the node's default is left. Leaves point
+    to themselves, so `depth` steps bring every sample to its leaf.
+    """
+
+    def __init__(self, trees):
+        # trees: list of (feature, threshold, left, right, default_left, value)
+        # arrays per tree, with local child ids and -1 children on leaves
+        roots, features, thresholds, lefts, rights, defaults, values = [], [], [], [], [], [], []
+        offset = 0
+        depth = 0
+        for feature, threshold, left, right, default_left, value in trees:
+            nodes = np.arange(len(feature))
+            leaf = left < 0
+            roots.append(offset)
+            features.append(np.where(leaf, 0, feature))
+            thresholds.append(np.where(leaf, 0, threshold).astype(np.float32))
+            lefts.append(np.where(leaf, nodes, left) + offset)
+            rights.append(np.where(leaf, nodes, right) + offset)
+            defaults.append(np.where(leaf, False, default_left))
+            values.append(np.where(leaf, value, 0.0))
+            depth = max(depth, _tree_depth(left, right))
+            offset += len(feature)
+        self.roots = np.array(roots, dtype=np.intp)
+        self.feature = np.ascontiguousarray(np.concatenate(features), dtype=np.intp)
+        self.threshold = np.ascontiguousarray(np.concatenate(thresholds), dtype=np.float32)
+        self.left = np.ascontiguousarray(np.concatenate(lefts), dtype=np.intp)
+        self.right = np.ascontiguousarray(np.concatenate(rights), dtype=np.intp)
+        self.default_left = np.ascontiguousarray(np.concatenate(defaults), dtype=bool)
+        self.value = np.ascontiguousarray(np.concatenate(values), dtype=np.float64)
+        self.depth = depth
+
+    def leaf_values(self, X):
+        """(n_samples, n_trees) leaf values reached by every row of float32 `X`."""
+        rows = np.arange(X.shape[0])[:, None]
+        node = np.broadcast_to(self.roots, (X.shape[0], len(self.roots)))
+        for _ in range(self.depth):
+            x = X[rows, self.feature[node]]
+            go_left = (x <= self.threshold[node]) | (np.isnan(x) & self.default_left[node])
+            node = np.where(go_left, self.left[node], self.right[node])
+        return self.value[node]
+
+def _tree_depth(left, right):
+    depth = 0
+    level = [0]
+    while level:
+        level = [child for node in level for child in (left[node], right[node]) if child >= 0]
+        depth += 1 if level else 0
+    return depth
+
+def _sigmoid(margin):
+    return 1.0 / (1.0 + np.exp(-margin))
+
+class GradientBoostingFlat:
+    """Binary sklearn GradientBoostingClassifier: init log-odds plus learning_rate times the summed leaves."""
+
+    def __init__(self, model):
+        if model.n_classes_ != 2 or model.estimators_.shape[1] != 1:
+            raise ValueError('Only binary gradient boosting models can be compiled')
+        trees = []
+        for estimator in model.estimators_[:, 0]:
+            tree = estimator.tree_
+            missing_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=bool))
+            trees.append((
+                tree.feature, _at_most(tree.threshold), tree.children_left, tree.children_right,
+                np.asarray(missing_left, dtype=bool), tree.value[:, 0, 0],
+            ))
+        self.trees = FlatTrees(trees)
+        self.learning_rate = model.learning_rate
+        # The init estimator's raw prediction is constant; recover it from one row
+        probe = np.zeros((1, model.n_features_in_), dtype=np.float32)
+        probe_frame = pd.DataFrame(probe, columns=getattr(model, 'feature_names_in_', None))
+        staged = self.learning_rate * self.trees.leaf_values(probe).sum(axis=1)
+        self.init_raw = float(model.decision_function(probe_frame)[0] - staged[0])
+
+    def predict_proba(self, X):
+        raw = self.init_raw + self.learning_rate * self.trees.leaf_values(X).sum(axis=1)
+        return _sigmoid(raw)
+
+class XGBoostFlat:
+    """Binary XGBoost classifier with the binary:logistic objective."""
+
+    def __init__(self, model):
+        booster = model.get_booster()
+        config = json.loads(booster.save_config())
+        objective = config['learner']['objective']['name']
+        if objective != 'binary:logistic':
+            raise ValueError(f"Unsupported XGBoost objective {objective}")
+        dump = json.loads(booster.save_raw('json'))['learner']
+        trees = []
+        for tree in dump['gradient_booster']['model']['trees']:
+            left = np.array(tree['left_children'], dtype=np.intp)
+            conditions = np.array(tree['split_conditions'], dtype=np.float32)
+            trees.append((
+                np.array(tree['split_indices'], dtype=np.intp), _below(conditions), left,
+                np.array(tree['right_children'], dtype=np.intp),
+                np.array(tree['default_left'], dtype=bool),
+                # Leaves keep their weight in split_conditions
+                conditions.astype(np.float64),
+            ))
+        self.trees = FlatTrees(trees)
+        base_score = float(dump['learner_model_param']['base_score'])
+        self.base_margin = float(np.log(base_score / (1 - base_score)))
+
+    def predict_proba(self, X):
+        return _sigmoid(self.base_margin + self.trees.leaf_values(X).sum(axis=1))
+
+def _flatten(model):
+    name = type(model).__name__
+    if name == 'GradientBoostingClassifier':
+        return GradientBoostingFlat(model)
+    if name == 'XGBClassifier':
+        return XGBoostFlat(model)
+    raise ValueError(f"No compiled inference for {name}")
+
+class CompiledEnsemble:
+    """
+    Request-time inference without pandas or the pickled estimators: the
+    MinMax scaler folded into a (scale, offset) pair and every model's trees
+    flattened into arrays walked with vectorized NumPy indexing.
+    """
+
+    def __init__(self, scaler, models):
+        if getattr(scaler, 'clip', False):
+            raise ValueError('Clipping MinMax scalers are not supported')
+        self.scale = np.ascontiguousarray(scaler.scale_, dtype=np.float64)
+        self.offset = np.ascontiguousarray(scaler.min_, dtype=np.float64)
+        self.models = {name: _flatten(model) for name, model in models.items()}
+
+    def transform(self, features):
+        """Scaled float32 matrix for raw feature rows, as MinMaxScaler.transform and the models' float32 cast."""
+        features = np.asarray(features, dtype=np.float64)
+        return np.ascontiguousarray(features * self.scale + self.offset, dtype=np.float32)
+
+    def predict_proba(self, X):
+        """Probability of phishing for every row of a scaled float32 matrix, per model."""
+        return {name: flat.predict_proba(X) for name, flat in self.models.items()}
+
+def validation_rows(scaler, count, seed=0):
+    # Feature rows spread over the scaler's fitted range, the -1/0 sentinels
+    # used for failed features, and the exact range ends
+    rng = np.random.default_rng(seed)
+    low, high = scaler.data_min_, scaler.data_max_
+    rows = rng.uniform(low - 1, high + 1, size=(count, len(low)))
+    sentinel = rng.random(rows.shape) < 0.2
+    rows[sentinel] = rng.choice([-1.0, 0.0], size=sentinel.sum())
+    rows = np.round(rows, rng.integers(0, 4))
+    return np.vstack([rows, low, high])
+
+def compile_ensemble(scaler, models, feature_columns, tolerance=TOLERANCE):
+    """
+    Build a CompiledEnsemble and check it against scaler.transform and every
+    model's predict_proba. Returns None, after logging why, when a model
+    cannot be compiled or disagrees by more than `tolerance`, so callers keep
+    using the models directly.
+    """
+    try:
+        ensemble = CompiledEnsemble(scaler, models)
+        rows = validation_rows(scaler, VALIDATION_ROWS)
+        scaled = scaler.transform(pd.DataFrame(rows, columns=feature_columns))
+        if not np.array_equal(ensemble.transform(rows), scaled.astype(np.float32)):
+            raise ValueError('folded scaling differs from the scaler')
+        compiled = ensemble.predict_proba(ensemble.transform(rows))
+        frame = pd.DataFrame(scaled, columns=feature_columns)
+        for name, model in models.items():
+            error = np.max(np.abs(compiled[name] - model.predict_proba(frame)[:, 1]))
+            if error > tolerance:
+                raise ValueError(f"{name} differs from predict_proba by {error:.2e}")
+            logging.info(f"Compiled {name}: largest difference from predict_proba {error:.2e}.")
+        return ensemble
+    except Exception as e:
+        logging.warning(f"Compiled inference disabled, using the models directly. Reason: {str(e)}")
+        return None
+
+def compile_model(model, rows, tolerance=TOLERANCE):
+    """
+    Flatten a single classifier that takes unscaled features and check it
+    against its predict_proba on the raw feature `rows`. Returns the
+    flattened model, whose predict_proba takes float32 rows and returns the
+    probability of class 1, or None after logging why.
+    """
+    try:
+        flat = _flatten(model)
+        error = np.max(np.abs(flat.predict_proba(np.ascontiguousarray(rows, dtype=np.float32)) - model.predict_proba(rows)[:, 1]))
+        if error > tolerance:
+            raise ValueError(f"differs from predict_proba by {error:.2e}")
+        return flat
+    except Exception as e:
+        logging.warning(f"Could not compile {type(model).__name__}. Reason: {str(e)}")
+        return None
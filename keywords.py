@@ -0,0 +1,87 @@
+import json
+import os
+from collections import deque
+
+KEYWORDS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'keywords.json')
+
+class KeywordMatcher:
+    """
+    Aho-Corasick automaton over a dictionary of keyword categories.
+
+    Every keyword of every category is compiled into one trie with failure
+    links, so all occurrences in a text are found in a single pass whose cost
+    does not grow with the number of keywords. A keyword may belong to
+    several categories.
+    """
+
+    def __init__(self, keywords):
+        # keywords: {category: iterable of keywords}
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [()]
+        categories = {}
+        for category, words in keywords.items():
+            for word in words:
+                if word:
+                    categories.setdefault(word, set()).add(category)
+        for word, word_categories in categories.items():
+            self._add(word, frozenset(word_categories))
+        self._link()
+
+    def _add(self, word, categories):
+        state = 0
+        for char in word:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+        self._output[state] = ((word, categories),)
+
+    def _link(self):
+        # Breadth-first, so the failure state of every parent is already known
+        pending = deque(self._goto[0].values())
+        while pending:
+            state = pending.popleft()
+            for char, next_state in self._goto[state].items():
+                pending.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                # Keywords ending at the failure state also end here
+                self._output[next_state] = self._output[next_state] + self._output[self._fail[next_state]]
+
+    def find_all(self, text):
+        """List every (start, keyword, categories) occurrence in `text`, overlaps included."""
+        goto, fail, output = self._goto, self._fail, self._output
+        matches = []
+        state = 0
+        for index, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for word, categories in output[state]:
+                matches.append((index - len(word) + 1, word, categories))
+        return matches
+
+    def keywords_in(self, text, category):
+        """Set of the distinct keywords of `category` that occur in `text`."""
+        return {word for _, word, categories in self.find_all(text) if category in categories}
+
+def load_keywords(*paths):
+    """
+    Read keyword categories from JSON files ({category: [keyword, ...]}),
+    merging the lists of later files into earlier ones. Keywords are
+    lowercased and de-duplicated, keeping their first position.
+    """
+    keywords = {}
+    for path in paths or (KEYWORDS_PATH,):
+        with open(path, encoding='utf-8') as f:
+            for category, words in json.load(f).items():
+                merged = keywords.setdefault(category, [])
+                merged.extend(word.lower() for word in words)
+    return {category: list(dict.fromkeys(words)) for category, words in keywords.items()}
@@ -0,0 +1,144 @@
+import argparse
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+import requests
+
+LABELS = (0, 1, -1)  # 0 for safe, 1 for phishing, -1 for other
+
+class LabelingQueue:
+    """
+    Predictions waiting for a ground-truth label.
+
+    Requests hand samples to a bounded in-memory queue and return at once; a
+    background worker persists them in an SQLite table so that pending
+    samples survive restarts. Labels are submitted later through the
+    /labels endpoint or this module's command line. A process forked from
+    the one that opened the queue gets its own connection and worker.
+    """
+
+    def __init__(self, path, max_pending=10000, queue_size=1000):
+        self.path = path
+        self.max_pending = max_pending
+        self.queue_size = queue_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        logging.info(f"{self.count()} samples are waiting for a label in {path}.")
+
+        self._start_worker()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS pending_samples ('
+            'url TEXT PRIMARY KEY, features TEXT NOT NULL, probability REAL, created_at REAL NOT NULL)'
+        )
+        conn.commit()
+        return conn
+
+    def _start_worker(self):
+        self._worker = threading.Thread(target=self._work, name='labeling-worker', daemon=True)
+        self._worker.start()
+
+    def _after_fork(self):
+        # Threads do not survive fork and the connection must not be shared;
+        # samples still queued in the parent are persisted by the parent
+        self._inherited_conn = self._conn
+        self._queue = queue.Queue(maxsize=self.queue_size)
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._start_worker()
+
+    def submit(self, url, features, probability):
+        """Queue a sample for labeling without blocking; returns False if the queue is full."""
+        try:
+            self._queue.put_nowait((url, features, probability))
+            return True
+        except queue.Full:
+            logging.warning(f"Labeling queue is full, dropping {url}.")
+            return False
+
+    def _work(self):
+        while True:
+            url, features, probability = self._queue.get()
+            try:
+                with self._lock:
+                    count = self._conn.execute('SELECT COUNT(*) FROM pending_samples').fetchone()[0]
+                    if count >= self.max_pending:
+                        logging.warning(f"{count} samples are already pending, dropping {url}.")
+                        continue
+                    self._conn.execute(
+                        'INSERT OR IGNORE INTO pending_samples (url, features, probability, created_at) VALUES (?, ?, ?, ?)',
+                        (url, json.dumps(features, default=lambda value: value.item()), probability, time.time()),
+                    )
+                    self._conn.commit()
+            except Exception as e:
+                logging.error(f"Failed to queue {url} for labeling. Reason: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def flush(self):
+        """Block until every submitted sample has been persisted."""
+        self._queue.join()
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM pending_samples').fetchone()[0]
+
+    def pending(self, limit=100):
+        """Oldest pending samples as dicts with url, probability and created_at."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT url, probability, created_at FROM pending_samples ORDER BY created_at LIMIT ?',
+                (limit,),
+            ).fetchall()
+        return [{'url': url, 'probability': probability, 'created_at': created_at} for url, probability, created_at in rows]
+
+    def get(self, url):
+        """Return (features, probability) of a pending sample, or None if it is not pending."""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT features, probability FROM pending_samples WHERE url = ?', (url,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def remove(self, url):
+        """Drop a pending sample once its label has been saved."""
+        with self._lock:
+            self._conn.execute('DELETE FROM pending_samples WHERE url = ?', (url,))
+            self._conn.commit()
+
+def main():
+    """Prompt for the label of every pending sample and submit it to the server."""
+    parser = argparse.ArgumentParser(description='Label pending ClickSafe predictions.')
+    parser.add_argument('--server', default='http://127.0.0.1:5000', help='Base URL of the ClickSafe backend')
+    parser.add_argument('--limit', type=int, default=100, help='Maximum number of samples to label')
+    args = parser.parse_args()
+
+    pending = requests.get(f"{args.server}/labels/pending", params={'limit': args.limit}, timeout=10).json()['pending']
+    if not pending:
+        print("No samples are waiting for a label.")
+        return
+    for sample in pending:
+        url = sample['url']
+        actual_prediction = input(f"Please enter the actual prediction for URL '{url}' (0 for safe, 1 for phishing, -1 for other, Enter to skip): ")
+        while actual_prediction not in ['0', '1', '-1', '']:
+            actual_prediction = input("Invalid input. Please enter 0 for safe, 1 for phishing, -1 for other or Enter to skip: ")
+        if not actual_prediction:
+            continue
+        response = requests.post(f"{args.server}/labels", json={'url': url, 'actual': int(actual_prediction)}, timeout=10)
+        print(response.json().get('message') or response.json().get('error'))
+
+if __name__ == '__main__':
+    main()
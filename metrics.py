@@ -0,0 +1,64 @@
+import os
+
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+
+# Seconds, from the sub-millisecond URL features up to the network deadline
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Time of each page content feature, of fetching and parsing the page they
+# share ('page_fetch', 'page_parse'), and of the single pass computing every
+# URL-only feature ('lexical')
+FEATURE_SECONDS = Histogram(
+    'clicksafe_feature_seconds', 'Time spent computing a feature', ['feature'], buckets=LATENCY_BUCKETS
+)
+# Wall and CPU time of every network source; their difference is time spent
+# waiting on the network
+SOURCE_SECONDS = Histogram(
+    'clicksafe_source_seconds', 'Wall time of a network feature source', ['source'], buckets=LATENCY_BUCKETS
+)
+SOURCE_CPU_SECONDS = Histogram(
+    'clicksafe_source_cpu_seconds', 'CPU time of a network feature source', ['source'], buckets=LATENCY_BUCKETS
+)
+# outcome: ok, error, timeout (missed the request deadline) or cached
+SOURCE_RESULTS = Counter(
+    'clicksafe_source_results_total', 'Network feature source outcomes', ['source', 'outcome']
+)
+EXTRACTION_SECONDS = Histogram(
+    'clicksafe_extraction_seconds', 'Wall time of the feature extraction of one URL', buckets=LATENCY_BUCKETS
+)
+# result: hit or miss
+CACHE_REQUESTS = Counter('clicksafe_cache_requests_total', 'Cache lookups', ['cache', 'result'])
+
+# Circuit breakers of the external providers (circuit_breaker.py). With
+# several workers the state shown is the worst one among the live workers
+CIRCUIT_STATE = Gauge(
+    'clicksafe_circuit_state', 'Circuit breaker state: 0 closed, 1 half-open, 2 open', ['provider'],
+    multiprocess_mode='livemax',
+)
+# state: the state entered
+CIRCUIT_TRANSITIONS = Counter(
+    'clicksafe_circuit_transitions_total', 'Circuit breaker state changes', ['provider', 'state']
+)
+CIRCUIT_REJECTIONS = Counter(
+    'clicksafe_circuit_rejections_total', 'Provider calls skipped because the circuit was open', ['provider']
+)
+# outcome: success or failure, as counted by the breaker
+PROVIDER_CALLS = Counter('clicksafe_provider_calls_total', 'Calls to external providers', ['provider', 'outcome'])
+
+def _multiprocess():
+    # Set for pre-forked workers so every process writes its samples to files
+    # in this directory, which are aggregated when the metrics are rendered
+    return bool(os.environ.get('PROMETHEUS_MULTIPROC_DIR'))
+
+def render():
+    """(body, content type) of the metrics in the Prometheus text format."""
+    registry = REGISTRY
+    if _multiprocess():
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_process_dead(pid):
+    """Drop the live-process samples of a worker that exited."""
+    if _multiprocess():
+        multiprocess.mark_process_dead(pid)
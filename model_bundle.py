@@ -0,0 +1,46 @@
+import logging
+import os
+
+from joblib import dump, load
+
+BUNDLE_PATH = 'model_bundle.joblib'
+BUNDLE_VERSION = 1  # Bumped whenever the bundled objects change shape
+
+def source_signature(paths):
+    """Size and modification time of each source file (None if missing), to detect a stale bundle."""
+    signature = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            signature[path] = (stat.st_size, stat.st_mtime_ns)
+        except OSError:
+            signature[path] = None
+    return signature
+
+def load_bundle(sources, path=BUNDLE_PATH):
+    """
+    Load the bundle at `path` with its arrays memory-mapped read-only, so
+    forked workers share the same pages. Returns the bundled dict, or None
+    when the file is missing, unreadable or was built from other sources.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        bundle = load(path, mmap_mode='r')
+    except Exception as e:
+        logging.warning(f"Could not read the model bundle {path}. Reason: {str(e)}")
+        return None
+    if bundle.get('version') != BUNDLE_VERSION or bundle.get('sources') != source_signature(sources):
+        logging.info(f"The model bundle {path} is out of date and will be rebuilt.")
+        return None
+    return bundle['contents']
+
+def save_bundle(contents, sources, path=BUNDLE_PATH):
+    """Write `contents` uncompressed (so arrays can be memory-mapped), replacing the old bundle atomically."""
+    tmp_path = f"{path}.tmp"
+    try:
+        dump({'version': BUNDLE_VERSION, 'sources': source_signature(sources), 'contents': contents}, tmp_path)
+        os.replace(tmp_path, path)
+        logging.info(f"Model bundle saved to {path}.")
+    except Exception as e:
+        logging.warning(f"Could not save the model bundle {path}. Reason: {str(e)}")
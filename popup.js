@@ -48,8 +48,15 @@ document.getElementById("check-button").addEventListener("click", function () {
   // Show loading message for the URL check
   document.getElementById("loading").style.display = "block";
 
-  // Make prediction by sending the URL to the backend
-  makePrediction(url).then((data) => {
+  // Make prediction by sending the URL to the backend, showing the early
+  // scores as they arrive and the verdict once every check is done
+  const showProgress = (data) => {
+    document.getElementById("loading").style.display = "none";
+    document.getElementById("result").innerHTML = progressMessage(data);
+    document.getElementById("result").style.display = "block";
+    document.getElementById("result").style.color = "#333";
+  };
+  const showResult = (data) => {
     // Hide loading message
     document.getElementById("loading").style.display = "none";
 
@@ -97,11 +104,20 @@ document.getElementById("check-button").addEventListener("click", function () {
     document.getElementById("result").style.display = "block";
     document.getElementById("result").style.color = color;
     document.querySelector(".container").style.borderColor = color;
-    // Show the analytics button after the result
+    // Show the analytics button after the final result
     document.getElementById("analytics-section").style.display = "inline-block";
     // Save SHAP explanations for analytics
     saveAnalytics(shapExplanations);
-  });
+  };
+  makePrediction(url, showProgress)
+    .then(showResult)
+    .catch((error) => {
+      console.error("Prediction failed:", error);
+      document.getElementById("loading").style.display = "none";
+      document.getElementById("result").innerText = "Could not check this URL. Please try again.";
+      document.getElementById("result").style.display = "block";
+      document.getElementById("result").style.color = "red";
+    });
 });
 
 // Event listener for the Check Analytics button (Check Website)
@@ -196,8 +212,16 @@ document
       // Show loading message for the tab check
       document.getElementById("loading-tab").style.display = "block";
 
-      // Make prediction by sending the active tab URL to the backend
-      makePrediction(urlToCheck).then((data) => {
+      // Make prediction by sending the active tab URL to the backend,
+      // showing the early scores as they arrive and the verdict once every
+      // check is done
+      const showProgress = (data) => {
+        document.getElementById("loading-tab").style.display = "none";
+        document.getElementById("tab-result").innerHTML = progressMessage(data);
+        document.getElementById("tab-result").style.display = "block";
+        document.getElementById("tab-result").style.color = "#333";
+      };
+      const showResult = (data) => {
         // Hide loading message
         document.getElementById("loading-tab").style.display = "none";
 
@@ -245,13 +269,22 @@ document
         document.getElementById("tab-result").style.display = "block";
         document.getElementById("tab-result").style.color = color;
         document.querySelector(".container").style.borderColor = color;
-        // Show the analytics button after the result
-        // Show the analytics button after the result
+        // Show the analytics button after the final result
         document.getElementById("analytics-section-tab").style.display =
           "inline-block";
         // Save SHAP explanations for analytics
         saveAnalytics(shapExplanations);
-      });
+      };
+      makePrediction(urlToCheck, showProgress)
+        .then(showResult)
+        .catch((error) => {
+          console.error("Prediction failed:", error);
+          document.getElementById("loading-tab").style.display = "none";
+          document.getElementById("tab-result").innerText =
+            "Could not check this tab. Please try again.";
+          document.getElementById("tab-result").style.display = "block";
+          document.getElementById("tab-result").style.color = "red";
+        });
     });
   });
 
@@ -283,18 +316,63 @@ function isValidURL(url) {
   return urlPattern.test(url) && !/\s/.test(url);
 }
 
-// Function to make prediction by sending the URL to the backend
-async function makePrediction(url) {
-  const response = await fetch("http://127.0.0.1:5000/predict", {
+// Message shown while the website checks run. The early scores come from
+// the lexical model or from the ensemble with some checks missing, so they
+// are shown as an estimate rather than a verdict
+function progressMessage(data) {
+  const probability =
+    data.partial_probability !== undefined && data.partial_probability !== null
+      ? data.partial_probability
+      : data.lexical_probability;
+  let message = "<i>Checking the website...</i>";
+  if (probability !== undefined && probability !== null) {
+    message += `<br>Early estimate: ${Math.round(probability * 100)}% risk.`;
+  }
+  return message;
+}
+
+// Function to make prediction by sending the URL to the backend. The
+// backend streams server-sent events: onProgress receives the early
+// (lexical) and partial scores, and the final result is returned
+async function makePrediction(url, onProgress) {
+  const response = await fetch("http://127.0.0.1:5000/predict_stream", {
     method: "POST",
     headers: {
       "Content-Type": "application/json",
     },
     body: JSON.stringify({ url: url }), // Send the URL in the request body
   });
+  if (!response.ok) {
+    throw new Error(`Prediction failed with status ${response.status}`);
+  }
 
-  const data = await response.json();
-  return data; // Return the entire data object containing final prediction and probability
+  const reader = response.body.getReader();
+  const decoder = new TextDecoder();
+  let buffer = "";
+  while (true) {
+    const { done, value } = await reader.read();
+    if (done) {
+      throw new Error("The prediction stream ended without a final result");
+    }
+    buffer += decoder.decode(value, { stream: true });
+    // Events are separated by a blank line
+    let end;
+    while ((end = buffer.indexOf("\n\n")) >= 0) {
+      const lines = buffer.slice(0, end).split("\n");
+      buffer = buffer.slice(end + 2);
+      const event = lines.find((line) => line.startsWith("event: ")).slice(7);
+      const data = JSON.parse(lines.find((line) => line.startsWith("data: ")).slice(6));
+      if (event === "final") {
+        return data; // The entire data object containing final prediction and probability
+      }
+      if (event === "error") {
+        throw new Error(data.details || data.error);
+      }
+      if (onProgress) {
+        onProgress(data);
+      }
+    }
+  }
 }
 
 function handleSearchEngineUrls(url) {
@@ -0,0 +1,154 @@
+import csv
+import logging
+import os
+import queue
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:
+    # No advisory locks (Windows): a single process must write the file
+    fcntl = None
+
+_COMPACT = object()  # Queue command asking the writer to compact the file
+_STOP = object()  # Queue command stopping the writer
+
+class SampleStore:
+    """
+    Append-only CSV store of labeled samples.
+
+    The set of stored URLs is read once when the store opens, so checking
+    whether a sample is new never touches the file. Rows are appended by a
+    single writer thread, and the file is periodically compacted to drop
+    duplicate URLs (for example rows written by another process). Appends
+    and compactions hold an exclusive lock on `<path>.lock`, so processes
+    sharing the file never write to a copy that another one is replacing,
+    and a writer reopens the file once another process replaced it. A
+    process forked from the one that opened the store gets its own writer.
+    """
+
+    def __init__(self, path, columns, compact_every=1000):
+        self.path = path
+        self.columns = columns
+        self.compact_every = compact_every
+        self._urls = set()
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._appended = 0
+
+        # Ensure the CSV file exists with correct columns
+        if not os.path.exists(path):
+            pd.DataFrame(columns=columns).to_csv(path, index=False)
+            logging.info(f"New file created: {path}")
+        else:
+            self._urls.update(pd.read_csv(path, usecols=['url'])['url'].dropna())
+        logging.info(f"Loaded {len(self._urls)} labeled URLs from {path}.")
+
+        self._start_writer()
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._after_fork)
+
+    def _start_writer(self):
+        self._writer = threading.Thread(target=self._write_loop, name='sample-store-writer', daemon=True)
+        self._writer.start()
+
+    def _after_fork(self):
+        # Threads do not survive fork; rows still queued in the parent are
+        # written by the parent
+        self._lock = threading.Lock()
+        self._queue = queue.Queue()
+        self._start_writer()
+
+    def __contains__(self, url):
+        with self._lock:
+            return url in self._urls
+
+    def add(self, row):
+        """Queue `row` (a dict keyed by column) for appending; returns False if its URL is already stored."""
+        with self._lock:
+            if row['url'] in self._urls:
+                return False
+            self._urls.add(row['url'])
+        self._queue.put([row.get(col) for col in self.columns])
+        return True
+
+    def compact(self):
+        """Ask the writer to rewrite the file without duplicate URLs."""
+        self._queue.put(_COMPACT)
+
+    def flush(self):
+        """Block until every queued row has been written."""
+        self._queue.join()
+
+    def close(self):
+        self._queue.put(_STOP)
+        self._writer.join()
+
+    @contextmanager
+    def _file_lock(self, lock_handle):
+        # Exclusive across processes; the writer thread is the only user within one
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(lock_handle, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_handle, fcntl.LOCK_UN)
+
+    def _current_handle(self, handle):
+        # Must be called with the file lock held. Another process's compaction
+        # replaces the file, leaving an open handle on the unlinked old one
+        if handle is not None:
+            try:
+                if os.fstat(handle.fileno()).st_ino == os.stat(self.path).st_ino:
+                    return handle
+            except FileNotFoundError:
+                pass
+            handle.close()
+        return open(self.path, 'a', newline='')
+
+    def _write_loop(self):
+        handle = None
+        lock_handle = open(f"{self.path}.lock", 'a')
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    if handle is not None:
+                        handle.close()
+                    lock_handle.close()
+                    return
+                with self._file_lock(lock_handle):
+                    handle = self._current_handle(handle)
+                    if item is not _COMPACT:
+                        csv.writer(handle).writerow(['' if value is None else value for value in item])
+                        handle.flush()
+                        self._appended += 1
+                    if item is _COMPACT or (self.compact_every and self._appended % self.compact_every == 0):
+                        # The file is replaced, so the append handle is reopened afterwards
+                        handle.close()
+                        handle = None
+                        self._compact()
+            except Exception as e:
+                logging.error(f"Failed to write to {self.path}. Reason: {str(e)}")
+            finally:
+                self._queue.task_done()
+
+    def _compact(self):
+        # Runs on the writer thread with the file lock held, so no append of
+        # this or another process can interleave with the rewrite
+        try:
+            data = pd.read_csv(self.path)
+            compacted = data.drop_duplicates(subset='url', keep='first')
+            if len(compacted) == len(data):
+                return
+            tmp_path = f"{self.path}.tmp"
+            compacted.to_csv(tmp_path, index=False)
+            os.replace(tmp_path, self.path)
+            logging.info(f"Compacted {self.path}: removed {len(data) - len(compacted)} duplicate rows.")
+        except Exception as e:
+            logging.error(f"Failed to compact {self.path}. Reason: {str(e)}")
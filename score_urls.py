@@ -0,0 +1,254 @@
+import argparse
+import csv
+import gzip
+import itertools
+import json
+import logging
+import os
+import signal
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+CHECKPOINT_EVERY = 1000  # Records written between checkpoints
+WINDOW_FACTOR = 4  # URLs in flight per worker, so one slow URL does not stall the others
+
+def detect_format(path):
+    """Input or output format from a file name: 'csv', 'jsonl' or 'txt'."""
+    name = path[:-3] if path.endswith('.gz') else path
+    if name.endswith('.csv'):
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    return 'txt'
+
+def read_urls(stream, fmt, column='url'):
+    """
+    Yield the URL of every input record, streaming: one per line for 'txt'
+    (blank lines and # comments skipped), the `column` field for 'csv' and
+    'jsonl' (where a line may also be a bare JSON string). Unreadable
+    records yield None, so every record gets an output line.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        if column not in (reader.fieldnames or []):
+            raise SystemExit(f"The CSV input has no '{column}' column.")
+        for row in reader:
+            yield (row[column] or '').strip()
+        return
+    for line in stream:
+        line = line.strip()
+        if not line or (fmt == 'txt' and line.startswith('#')):
+            continue
+        if fmt == 'txt':
+            yield line
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            yield None
+            continue
+        yield record.get(column) if isinstance(record, dict) else record
+
+class ResultWriter:
+    """Appends scored records to a stream as JSON lines or CSV rows."""
+
+    def __init__(self, stream, fmt, model_names, header=True):
+        self.stream = stream
+        self.fmt = fmt
+        self._csv = None
+        if fmt == 'csv':
+            fieldnames = ['url', 'final_probability', *model_names, 'error']
+            self._csv = csv.DictWriter(stream, fieldnames=fieldnames, extrasaction='ignore')
+            if header:
+                self._csv.writeheader()
+
+    def write(self, record):
+        if self._csv is None:
+            self.stream.write(json.dumps(record) + '\n')
+            return
+        row = {key: value for key, value in record.items() if key != 'model_probabilities'}
+        row.update(record.get('model_probabilities') or {})
+        self._csv.writerow(row)
+
+class Checkpoint:
+    """
+    Progress of a run, saved atomically next to the output: the number of
+    input records done and the output size after their results. Resuming
+    skips those records and truncates any result written after the save.
+    """
+
+    def __init__(self, path, source):
+        self.path = path
+        self.source = source
+        self.records = 0
+        self.offset = 0
+        self.complete = False
+
+    def load(self):
+        """Restore the saved progress; False if there is none for this input."""
+        try:
+            with open(self.path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return False
+        if saved.get('input') != self.source:
+            raise SystemExit(f"The checkpoint {self.path} belongs to another input: {saved.get('input')}")
+        self.records, self.offset, self.complete = saved['records'], saved['offset'], saved.get('complete', False)
+        return True
+
+    def save(self, records, output, complete=False):
+        # The results are on disk before the checkpoint points past them
+        output.flush()
+        os.fsync(output.fileno())
+        self.records, self.offset, self.complete = records, os.fstat(output.fileno()).st_size, complete
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump({'input': self.source, 'records': records, 'offset': self.offset, 'complete': complete}, f)
+        os.replace(tmp_path, self.path)
+
+def score_url(url):
+    """Output record of one URL: its ensemble and per-model probabilities, or an error."""
+    # Imported on first use so --help does not load the feature extractor
+    import feature_extract
+    import scoring
+    if not isinstance(url, str) or not url:
+        return {'url': url, 'error': 'URL is required'}
+    try:
+        df_features = feature_extract.extract_features(url)
+        features_scaled = scoring.scale_features(df_features[feature_extract.FEATURE_NAMES].to_numpy(dtype=float))
+        final_probability, model_probabilities = scoring.ensemble_probability(features_scaled)
+    except Exception as e:
+        logging.error(f"Scoring failed for URL '{url}': {str(e)}")
+        return {'url': url, 'error': str(e)}
+    return {'url': url, 'final_probability': final_probability, 'model_probabilities': model_probabilities}
+
+def score_stream(urls, workers):
+    """
+    Yield the record of every URL in input order, scoring up to
+    `workers` URLs at once. Only a bounded window of URLs is read ahead,
+    so memory stays constant however long the input is.
+    """
+    window = workers * WINDOW_FACTOR
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='score') as executor:
+        try:
+            for url in urls:
+                pending.append(executor.submit(score_url, url))
+                # Emit finished results at the head, and wait for it once the window is full
+                while pending and (len(pending) >= window or pending[0].done()):
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+def _open_input(path):
+    if path == '-':
+        return sys.stdin
+    if path.endswith('.gz'):
+        return gzip.open(path, 'rt', encoding='utf-8', newline='')
+    return open(path, encoding='utf-8', newline='')
+
+def _positive_int(value):
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return number
+
+def _interrupt(signum, frame):
+    # SIGTERM stops the run like Ctrl-C, saving the checkpoint on the way out
+    raise KeyboardInterrupt
+
+def main():
+    """Score a file of URLs with the loaded models, without going through the HTTP API."""
+    parser = argparse.ArgumentParser(description='Score a large list of URLs with the ClickSafe models.')
+    parser.add_argument('input', nargs='?', default='-', help="URLs as text, CSV or JSONL (optionally .gz), '-' for stdin")
+    parser.add_argument('--input-format', choices=['txt', 'csv', 'jsonl'], help='Default: from the file name, txt for stdin')
+    parser.add_argument('--column', default='url', help='Field holding the URL in CSV and JSONL input')
+    parser.add_argument('--output', '-o', help='Results file (default: stdout)')
+    parser.add_argument('--output-format', choices=['jsonl', 'csv'], help='Default: from the file name, jsonl for stdout')
+    parser.add_argument('--workers', type=_positive_int, default=16, help='URLs scored concurrently')
+    parser.add_argument('--checkpoint', help='Progress file (default: <output>.checkpoint)')
+    parser.add_argument(
+        '--checkpoint-every', type=_positive_int, default=CHECKPOINT_EVERY, help='Records between checkpoints'
+    )
+    parser.add_argument('--resume', action='store_true', help='Continue an interrupted run from its checkpoint')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    input_format = args.input_format or ('txt' if args.input == '-' else detect_format(args.input))
+    output_format = args.output_format or ('jsonl' if not args.output else 'csv' if detect_format(args.output) == 'csv' else 'jsonl')
+    if args.resume and not args.output:
+        raise SystemExit("--resume needs an --output file.")
+
+    checkpoint = None
+    if args.output:
+        source = os.path.abspath(args.input) if args.input != '-' else '-'
+        checkpoint = Checkpoint(args.checkpoint or f"{args.output}.checkpoint", source)
+    skip = 0
+    if args.resume and checkpoint.load():
+        if checkpoint.complete:
+            logging.info(f"{args.output} is already complete ({checkpoint.records} records).")
+            return
+        skip = checkpoint.records
+        logging.info(f"Resuming after {skip} records.")
+    elif args.resume:
+        logging.info(f"No checkpoint found at {checkpoint.path}, starting from the beginning.")
+
+    # Imported here so --help does not load the models. Only the scoring
+    # code is used: the web backend (app.py) would also open its sample store
+    # and labeling queue in the working directory
+    import feature_extract
+    import http_client
+    import scoring
+    scoring.load_models()
+    # Every URL runs its network sources at once on the shared source pool
+    source_workers = args.workers * len(feature_extract.NETWORK_SOURCES)
+    if source_workers > feature_extract.SOURCE_WORKERS:
+        feature_extract.set_source_workers(source_workers)
+    # and sends one request to each provider host (Google, SimilarWeb)
+    if args.workers > http_client.MAX_CONNECTIONS_PER_HOST:
+        http_client.set_max_connections_per_host(args.workers)
+
+    if args.output:
+        if skip:
+            # Drop results written after the checkpoint, they are scored again
+            with open(args.output, 'r+b') as f:
+                f.truncate(checkpoint.offset)
+        output = open(args.output, 'a' if skip else 'w', encoding='utf-8', newline='')
+    else:
+        output = sys.stdout
+    writer = ResultWriter(output, output_format, list(scoring.MODEL_PATHS), header=not skip)
+    signal.signal(signal.SIGTERM, _interrupt)
+
+    done = skip
+    started = time.monotonic()
+    stream = _open_input(args.input)
+    try:
+        urls = itertools.islice(read_urls(stream, input_format, args.column), skip, None)
+        for record in score_stream(urls, args.workers):
+            writer.write(record)
+            done += 1
+            if (done - skip) % args.checkpoint_every == 0:
+                if checkpoint is not None:
+                    checkpoint.save(done, output)
+                logging.info(f"Scored {done} URLs ({(done - skip) / (time.monotonic() - started):.1f} per second).")
+        if checkpoint is not None:
+            checkpoint.save(done, output, complete=True)
+        logging.info(f"Scored {done} URLs in total.")
+    except KeyboardInterrupt:
+        if checkpoint is not None:
+            checkpoint.save(done, output)
+            logging.warning(f"Interrupted after {done} URLs, run again with --resume to continue.")
+        raise SystemExit(130)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+        if output is not sys.stdout:
+            output.close()
+
+if __name__ == '__main__':
+    main()
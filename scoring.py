@@ -0,0 +1,140 @@
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from joblib import load
+
+from feature_extract import FEATURE_NAMES, LEXICAL_FEATURES, timed_lexical_features
+from inference import GradientBoostingFlat, VALIDATION_ROWS, compile_ensemble, compile_model, validation_rows
+from model_bundle import load_bundle, save_bundle
+
+# Pickled models and scaler. Requests are served from the compiled bundle, so
+# these are only unpickled to rebuild it, for SHAP, or as a fallback
+MODEL_PATHS = {
+    # 'randomforestclassifier': "randomforestclassifier.pkl",
+    'xgbclassifier': "xgbclassifier.pkl",
+    'gradientboostingclassifier': "gradientboostingclassifier.pkl",
+    # 'extratreesclassifier': "extratreesclassifier.pkl",
+}
+SCALER_PATH = 'minmax_scaler.pkl'
+# Lexical-only model for the fast /predict mode, trained by train_lexical_model.py
+LEXICAL_MODEL_PATH = 'lexical_model.pkl'
+# The bundle is rebuilt whenever one of these files changes
+BUNDLE_SOURCES = [*MODEL_PATHS.values(), SCALER_PATH, LEXICAL_MODEL_PATH]
+
+# Scaling folded into (scale, offset) and the trees flattened into arrays,
+# memory-mapped from the bundle; None means the models are used directly.
+# Both are set by load_models(), importing this module loads nothing
+compiled_ensemble = None
+lexical_model = None
+
+_models = None
+_scaler = None
+model_lock = threading.Lock()
+
+def get_models():
+    """The pickled models, loaded on first use."""
+    global _models
+    with model_lock:
+        if _models is None:
+            logging.info("Loading models...")
+            _models = {name: load(path) for name, path in MODEL_PATHS.items()}
+            logging.info("Models loaded successfully.")
+        return _models
+
+def get_scaler():
+    """The pickled MinMax scaler, loaded on first use."""
+    global _scaler
+    with model_lock:
+        if _scaler is None:
+            logging.info("Loading scaler...")
+            _scaler = load(SCALER_PATH)
+            logging.info("Scaler loaded successfully.")
+        return _scaler
+
+def build_model_bundle():
+    """
+    Compile the pickled models and validate them, then save the result as the
+    model bundle. Returns the bundle contents: the compiled ensemble (None if
+    compilation failed) and the lexical model, compiled when possible.
+    """
+    scaler = get_scaler()
+    compiled = compile_ensemble(scaler, get_models(), FEATURE_NAMES)
+    lexical = None
+    if os.path.exists(LEXICAL_MODEL_PATH):
+        lexical = load(LEXICAL_MODEL_PATH)
+        lexical_columns = [FEATURE_NAMES.index(name) for name in LEXICAL_FEATURES]
+        lexical = compile_model(lexical, validation_rows(scaler, VALIDATION_ROWS)[:, lexical_columns]) or lexical
+    contents = {'compiled_ensemble': compiled, 'lexical_model': lexical}
+    if compiled is not None:
+        save_bundle(contents, BUNDLE_SOURCES)
+    return contents
+
+def load_models():
+    """Load the model bundle, building it first when it is missing or out of date."""
+    global compiled_ensemble, lexical_model
+    bundle = load_bundle(BUNDLE_SOURCES)
+    if bundle is None:
+        logging.info("Building the model bundle...")
+        bundle = build_model_bundle()
+    compiled_ensemble = bundle['compiled_ensemble']
+    lexical_model = bundle['lexical_model']
+    if lexical_model is None:
+        logging.info("No lexical model found, fast mode will use the full pipeline.")
+
+def reload_models():
+    """Drop the models loaded from the old files and load the bundle again."""
+    global _models, _scaler
+    with model_lock:
+        _models = _scaler = None
+    load_models()
+
+def scale_features(features):
+    """Scale a matrix of feature rows (FEATURE_NAMES order) in a single transform."""
+    if compiled_ensemble is not None:
+        return compiled_ensemble.transform(features)
+    return get_scaler().transform(pd.DataFrame(features, columns=FEATURE_NAMES))
+
+def predict_probabilities(features_scaled):
+    """
+    Probability of phishing for every row of a scaled matrix from each model,
+    through the compiled ensemble when available and otherwise with one
+    predict_proba call per model. Models that fail map to None.
+    """
+    if compiled_ensemble is not None:
+        try:
+            return compiled_ensemble.predict_proba(features_scaled)
+        except Exception as e:
+            logging.error(f"Compiled inference failed, using the models directly: {str(e)}")
+    df_features_scaled = pd.DataFrame(features_scaled, columns=FEATURE_NAMES)
+    model_probabilities = {}
+    for model_name, model in get_models().items():
+        try:
+            model_probabilities[model_name] = model.predict_proba(df_features_scaled)[:, 1]
+        except Exception as e:
+            model_probabilities[model_name] = None
+            logging.error(f"Error with model {model_name}: {str(e)}")
+    return model_probabilities
+
+def fast_score(url):
+    """Probability of phishing from the lexical features alone."""
+    return lexical_probability(timed_lexical_features(url))
+
+def lexical_probability(features):
+    """Probability of phishing the lexical model gives a dict holding the lexical features."""
+    row = np.array([[features[name] for name in LEXICAL_FEATURES]], dtype=np.float32)
+    if isinstance(lexical_model, GradientBoostingFlat):
+        return float(lexical_model.predict_proba(row)[0])
+    return float(lexical_model.predict_proba(row)[0][1])
+
+def ensemble_probability(features_scaled):
+    """Mean and per-model probability of phishing for the first row of a scaled matrix."""
+    model_probabilities = {
+        model_name: float(probabilities[0]) if probabilities is not None else None  # Convert to float
+        for model_name, probabilities in predict_probabilities(features_scaled).items()
+    }
+    valid_probabilities = [prob for prob in model_probabilities.values() if prob is not None]
+    final_probability = float(np.mean(valid_probabilities)) if valid_probabilities else None
+    return final_probability, model_probabilities
@@ -0,0 +1,242 @@
+import argparse
+import gc
+import logging
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from werkzeug.serving import BaseWSGIServer, WSGIRequestHandler
+
+GRACEFUL_TIMEOUT = 30  # Seconds a stopping worker gets to finish its requests
+POLL_INTERVAL = 0.2  # Seconds between checks of the workers and pending signals
+
+class RequestHandler(WSGIRequestHandler):
+    # One request per connection, so an idle keep-alive client never holds a thread
+    protocol_version = 'HTTP/1.0'
+
+class PooledWSGIServer(BaseWSGIServer):
+    """
+    WSGI server running requests on a fixed pool of threads. A worker only
+    accepts a new connection once one of its threads is free, leaving the
+    next connections on the shared socket to idle workers.
+    """
+
+    multithread = True
+    multiprocess = True
+
+    def __init__(self, host, port, app, threads, fd=None):
+        super().__init__(host, port, app, handler=RequestHandler, fd=fd)
+        # Workers race for each connection; the losers must not block in accept
+        self.socket.setblocking(False)
+        self._slots = threading.BoundedSemaphore(threads)
+        self._executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='request')
+
+    def _handle_request_noblock(self):
+        # Called by serve_forever when the shared socket is readable. The
+        # connection is only accepted once a thread is free: until then it
+        # stays in the backlog, where an idle worker can take it. The wait
+        # is bounded so that serve_forever still notices shutdown()
+        if not self._slots.acquire(timeout=POLL_INTERVAL):
+            return
+        try:
+            request, client_address = self.get_request()
+        except OSError:
+            # Another worker accepted it first
+            self._slots.release()
+            return
+        if self.verify_request(request, client_address):
+            self.process_request(request, client_address)
+        else:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def process_request(self, request, client_address):
+        # Holds the slot taken before the accept, released by _handle
+        self._executor.submit(self._handle, request, client_address)
+
+    def _handle(self, request, client_address):
+        try:
+            self.finish_request(request, client_address)
+        except Exception:
+            self.handle_error(request, client_address)
+        finally:
+            self.shutdown_request(request)
+            self._slots.release()
+
+    def drain(self):
+        """Wait for the requests in progress to finish."""
+        self._executor.shutdown(wait=True)
+
+class PreforkServer:
+    """
+    Pre-fork server: the parent loads the app once, freezes the garbage
+    collector so the loaded objects stay in pages shared copy-on-write, and
+    forks workers that accept connections from one shared listening socket.
+
+    Signals to the parent: SIGHUP reloads the model files, starts a new
+    generation of workers and then retires the old one once its requests are
+    done; SIGTERM and SIGINT stop every worker gracefully.
+    """
+
+    def __init__(self, backend, host, port, workers, threads):
+        self.backend = backend  # The imported app module
+        self.host = host
+        self.port = port
+        self.worker_count = workers
+        self.threads = threads
+        self.workers = {}  # pid -> generation
+        self.generation = 0
+        self.socket = socket.create_server(
+            (host, port), family=socket.AF_INET6 if ':' in host else socket.AF_INET, backlog=1024
+        )
+        self._signals = []  # Received by the handler, processed by the main loop
+
+    def run(self):
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, frame: self._signals.append(signum))
+        self._preload()
+        logging.info(f"Listening on {self.host}:{self.port} with {self.worker_count} workers of {self.threads} threads.")
+        self._spawn_workers()
+        while True:
+            while self._signals:
+                signum = self._signals.pop(0)
+                if signum == signal.SIGHUP:
+                    self.reload()
+                else:
+                    self.stop()
+                    return
+            self._reap()
+            time.sleep(POLL_INTERVAL)
+
+    def _preload(self):
+        # Load everything a worker would otherwise load on first use, then move
+        # it out of the collector's reach: collections in the workers would
+        # otherwise write to every object's header and unshare its page
+        self.backend.get_models()
+        self.backend.get_scaler()
+        self.backend.get_explainers()
+        gc.collect()
+        gc.freeze()
+
+    def _spawn_workers(self):
+        while sum(generation == self.generation for generation in self.workers.values()) < self.worker_count:
+            pid = os.fork()
+            if pid == 0:
+                code = 0
+                try:
+                    self._serve()
+                except Exception as e:
+                    logging.error(f"Worker {os.getpid()} failed. Reason: {str(e)}")
+                    code = 1
+                finally:
+                    os._exit(code)
+            self.workers[pid] = self.generation
+
+    def _serve(self):
+        # Runs in the worker until the parent asks it to stop
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+        server = PooledWSGIServer(self.host, self.port, self.backend.app, self.threads, fd=self.socket.fileno())
+        def stop(signum, frame):
+            # shutdown() waits for serve_forever, so it cannot run in this thread
+            threading.Thread(target=server.shutdown, daemon=True).start()
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+        logging.info(f"Worker {os.getpid()} started.")
+        server.serve_forever()
+        server.drain()
+        self.backend.sample_store.flush()
+        self.backend.labeling_queue.flush()
+        logging.info(f"Worker {os.getpid()} stopped.")
+
+    def _reap(self):
+        while self.workers:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+            if pid == 0:
+                return
+            generation = self.workers.pop(pid, None)
+            self.backend.metrics.mark_process_dead(pid)
+            if generation == self.generation:
+                logging.warning(f"Worker {pid} exited unexpectedly (status {status}), starting a new one.")
+                self._spawn_workers()
+
+    def reload(self):
+        """Reload the model files in the parent and replace the workers without dropping requests."""
+        logging.info("Reloading models...")
+        gc.unfreeze()
+        try:
+            self.backend.reload_models()
+            self._preload()
+        except Exception as e:
+            logging.error(f"Reload failed, the current workers keep serving. Reason: {str(e)}")
+            gc.freeze()
+            return
+        retiring = list(self.workers)
+        self.generation += 1
+        # New workers share the listening socket, so nothing is refused while
+        # the old ones finish their requests
+        self._spawn_workers()
+        for pid in retiring:
+            self._signal(pid, signal.SIGTERM)
+        logging.info(f"Models reloaded, retiring {len(retiring)} workers.")
+
+    def stop(self):
+        """Stop every worker, waiting up to GRACEFUL_TIMEOUT for their requests."""
+        logging.info("Stopping workers...")
+        for pid in self.workers:
+            self._signal(pid, signal.SIGTERM)
+        deadline = time.monotonic() + GRACEFUL_TIMEOUT
+        while self.workers and time.monotonic() < deadline:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+            if pid:
+                self.workers.pop(pid, None)
+                self.backend.metrics.mark_process_dead(pid)
+            else:
+                time.sleep(POLL_INTERVAL)
+        for pid in self.workers:
+            logging.warning(f"Worker {pid} did not stop in time, killing it.")
+            self._signal(pid, signal.SIGKILL)
+        self.socket.close()
+
+    def _signal(self, pid, signum):
+        try:
+            os.kill(pid, signum)
+        except ProcessLookupError:
+            pass
+
+def main():
+    """Serve the ClickSafe backend with several worker processes."""
+    parser = argparse.ArgumentParser(description='Serve the ClickSafe backend with pre-forked workers.')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on')
+    parser.add_argument('--port', type=int, default=5000, help='Port to listen on')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Number of worker processes')
+    parser.add_argument('--threads', type=int, default=8, help='Request threads per worker')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s:%(process)d:%(name)s:%(message)s')
+
+    # Workers share their metrics through files, so /metrics reports every
+    # worker whichever one answers; this must be set before the app is imported
+    metrics_dir = None
+    if not os.environ.get('PROMETHEUS_MULTIPROC_DIR') and hasattr(os, 'fork'):
+        metrics_dir = tempfile.mkdtemp(prefix='clicksafe-metrics-')
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = metrics_dir
+
+    # Imported here so --help does not load the models
+    import app as backend
+
+    if not hasattr(os, 'fork'):
+        logging.warning("Forking is not supported on this platform, serving from a single process.")
+        backend.app.run(host=args.host, port=args.port, threaded=True)
+        return
+    try:
+        PreforkServer(backend, args.host, args.port, args.workers, args.threads).run()
+    finally:
+        if metrics_dir:
+            shutil.rmtree(metrics_dir, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
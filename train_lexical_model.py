@@ -0,0 +1,40 @@
+import argparse
+import logging
+
+import numpy as np
+import pandas as pd
+from joblib import dump
+from sklearn.ensemble import GradientBoostingClassifier
+from sklearn.model_selection import train_test_split
+
+from feature_extract import LEXICAL_FEATURES
+
+def main():
+    """Train the lexical-only model used by the fast /predict mode."""
+    parser = argparse.ArgumentParser(description='Train the lexical-only ClickSafe model.')
+    parser.add_argument('--data', default='new_data.csv', help='Labeled dataset with the extracted feature columns')
+    parser.add_argument('--output', default='lexical_model.pkl', help='Where to save the trained model')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+
+    data = pd.read_csv(args.data)
+    # Only samples labeled safe (0) or phishing (1) are usable
+    data = data[data['actual'].isin([0, 1])]
+    if data['actual'].nunique() < 2:
+        raise SystemExit(f"{args.data} needs samples of both classes to train the lexical model.")
+    features = data[LEXICAL_FEATURES].to_numpy(dtype=float)
+    labels = data['actual'].to_numpy(dtype=int)
+    logging.info(f"Training on {len(labels)} samples with {len(LEXICAL_FEATURES)} lexical features.")
+
+    X_train, X_test, y_train, y_test = train_test_split(features, labels, test_size=0.2, random_state=42, stratify=labels)
+    model = GradientBoostingClassifier(random_state=42)
+    model.fit(X_train, y_train)
+    logging.info(f"Held-out accuracy: {np.mean(model.predict(X_test) == y_test):.4f}")
+
+    # Refit on every sample before saving
+    model.fit(features, labels)
+    dump(model, args.output)
+    logging.info(f"Lexical model saved to {args.output}.")
+
+if __name__ == '__main__':
+    main()